@@ -1,24 +1,33 @@
 import streamlit as st
-import pandas as pd
+from streamlit.errors import StreamlitAPIException
 import time
 import sqlite3
 from datetime import datetime
-import requests
 import json
 import os
 import re
 import io
-
-# Page Configuration
-st.set_page_config(
-    page_title="Hiring Skilled Candidates - AI Interview Platform",
-    page_icon="🎯",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+import html
+import uuid
+import hashlib
+import hmac
+import threading
+import queue
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import llm_scheduler
+import storage
+import skills
+import rubric
+import archive
+import question_bank
+import llm_cassette
 
 # Custom CSS
-st.markdown("""
+APP_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #2c3e50 0%, #3498db 100%);
@@ -106,10 +115,10 @@ st.markdown("""
         text-align: center;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # Professional Header
-st.markdown("""
+HEADER_HTML = """
 <div class="main-header">
     <h1>🎯 Hiring Skilled Candidates</h1>
     <h2>AI-Powered Technical Interview & Assessment Platform</h2>
@@ -121,7 +130,26 @@ st.markdown("""
         <span class="ai-badge">🎙️ LIVE RECORDING</span>
     </div>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+# Page Configuration
+@st.cache_resource
+def page_chrome_html():
+    """CSS and header minified once per process and sent as a single element"""
+    css = re.sub(r"\s+", " ", APP_CSS)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css)
+    header = re.sub(r">\s+<", "> <", HEADER_HTML.strip())
+    return css.strip() + header
+
+def render_page_chrome():
+    """Page config, custom CSS and header shown at the top of every page"""
+    st.set_page_config(
+        page_title="Hiring Skilled Candidates - AI Interview Platform",
+        page_icon="🎯",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(page_chrome_html(), unsafe_allow_html=True)
 
 # Configuration Class
 class AIConfig:
@@ -141,29 +169,314 @@ class AIConfig:
     
     TECHNICAL_TIME = 180
     PROJECT_TIME = 300
+    
+    # Media uploads from the recording component. Upload state lives in the memory of the
+    # one process holding MEDIA_UPLOAD_PORT; other workers (shared-sqlite) keep recordings
+    # in the browser, so interviews that record must be routed to that media worker
+    MEDIA_DIR = os.getenv("MEDIA_DIR", "media")
+    MEDIA_UPLOAD_HOST = os.getenv("MEDIA_UPLOAD_HOST", "0.0.0.0")
+    MEDIA_UPLOAD_PORT = int(os.getenv("MEDIA_UPLOAD_PORT", "8502"))
+    MEDIA_UPLOAD_URL = os.getenv("MEDIA_UPLOAD_URL", "")
+    # Browser origins allowed to upload (comma-separated); by default the app on the same host
+    MEDIA_ALLOWED_ORIGINS = [o.strip().rstrip('/') for o in os.getenv("MEDIA_ALLOWED_ORIGINS", "").split(",") if o.strip()]
+    MEDIA_MAX_BYTES = 200 * 1024 * 1024
+    MEDIA_SESSION_MAX_BYTES = int(os.getenv("MEDIA_SESSION_MAX_BYTES", str(1024 * 1024 * 1024)))
+    MEDIA_TOTAL_MAX_BYTES = int(os.getenv("MEDIA_TOTAL_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+    MEDIA_FINISH_WAIT_SECONDS = 5
+    MEDIA_STALE_UPLOAD_SECONDS = 3600
+    MEDIA_ORPHAN_SECONDS = 24 * 3600
+    MEDIA_COMPACTION_INTERVAL = 600
+    
+    # Local speech-to-text for recorded answers (faster-whisper, CPU int8)
+    TRANSCRIPTION_MODEL = os.getenv("WHISPER_MODEL", "base.en")
+    TRANSCRIPTION_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+    TRANSCRIPTION_QUEUE_SIZE = 64
+    TRANSCRIPTION_BATCH_FILES = 4
+    TRANSCRIPTION_DECODE_BATCH = 8
+    TRANSCRIPTION_TIMEOUT = 60
+    TRANSCRIPTION_RESULT_CACHE = 1000
+    
+    # Shared LLM rate limit (per process) and retry policy for 429 responses
+    LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "1"))
+    LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+    LLM_MAX_CONCURRENCY = 8
+    LLM_MAX_RETRIES = 3
+    LLM_QUEUE_TIMEOUT = 120
+    
+    # Record/replay of LLM traffic: "off", "record" (append replies to the cassette) or
+    # "replay" (serve replies from it offline, sleeping LATENCY_SCALE x the recorded latency)
+    LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off")
+    LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl.gz")
+    LLM_CASSETTE_LATENCY_SCALE = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "0"))
+    
+    # Storage backend: "sqlite" (single process) or "shared-sqlite" (WAL, several worker processes)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+    
+    # Bulk screening uploads from the HR dashboard
+    BATCH_UPLOAD_DIR = os.getenv("BATCH_UPLOAD_DIR", "batch_uploads")
+    
+    # Adaptive interview: stop a skill early once its hiring band is settled
+    ADAPTIVE_INTERVIEW = True
+    ADAPTIVE_MIN_QUESTIONS = 2
+    ADAPTIVE_CONFIDENCE_Z = 1.96
+    ADAPTIVE_SCORE_SD_FLOOR = 10
+    
+    # Question bank: generated questions shared per (canonical skill id, experience level),
+    # refreshed after QUESTION_BANK_MAX_AGE_DAYS and pre-generated for popular skills
+    QUESTION_BANK_MAX_AGE_DAYS = 7
+    QUESTION_BANK_TOP_N = 30
+    QUESTION_BANK_WARMUP_INTERVAL = 3600
+    QUESTION_BANK_WARMUP_CALLS = 20
+    QUESTION_BANK_CALL_INTERVAL = 5.0
+    # Local hours the warmup may run in, e.g. "1-6"; empty runs whenever the LLM queue is idle
+    QUESTION_BANK_WARMUP_HOURS = os.getenv("QUESTION_BANK_WARMUP_HOURS", "")
+    
+    # Scoring rubric (thresholds and per-skill weights); the built-in default when the file is missing
+    RUBRIC_PATH = os.getenv("RUBRIC_PATH", "rubric.json")
+    
+    # Answers of finished interviews older than this move to the Parquet archive (needs pyarrow)
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    
+    # Seconds between HR dashboard polls for new interviews (0 turns live updates off)
+    DASHBOARD_REFRESH_SECONDS = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "15"))
+    
+    # Worker processes for rebuilding the answer similarity index from the dashboard
+    SIMILARITY_WORKERS = int(os.getenv("SIMILARITY_WORKERS", "2"))
+    
+    # Seconds between progress updates of dashboard jobs running in the background
+    JOB_POLL_SECONDS = 2
+
+# Result styles: result status -> (emoji, color); the score thresholds live in the rubric
+RESULT_STYLES = {
+    "HIRED - OUTSTANDING": ("🏆", "#27ae60"),
+    "HIRED - EXCELLENT": ("🌟", "#27ae60"),
+    "HIRED - GOOD": ("✅", "#27ae60"),
+    "UNDER REVIEW": ("⏳", "#f39c12"),
+    "NOT SELECTED": ("❌", "#e74c3c")
+}
+
+def get_rubric():
+    """Active scoring rubric (reloaded when the rubric file changes)"""
+    return rubric.load_rubric(AIConfig.RUBRIC_PATH)
+
+def determine_result(final_score):
+    """Map a final score to its (result_status, emoji, color) band"""
+    result_status = get_rubric().result_status(final_score)
+    if result_status in RESULT_STYLES:
+        return (result_status,) + RESULT_STYLES[result_status]
+    if result_status.startswith("HIRED"):
+        return result_status, "✅", "#27ae60"
+    return result_status, "⏳", "#f39c12"
+
+def compute_final_assessment(responses):
+    """Final score and overall speaking quality from scored responses"""
+    return get_rubric().assess(responses)
+
+def hiring_band(score):
+    """Hiring decision band (HIRED / UNDER REVIEW / NOT SELECTED) for a score"""
+    return determine_result(score)[0].split(' - ')[0]
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", 'hiring_skilled_candidates.db')
+
+# Session keys checkpointed so another worker can resume an in-flight interview
+# (responses are not included: they are stored per answer in interview_responses)
+SESSION_CHECKPOINT_KEYS = [
+    "stage", "candidate_data", "generated_questions", "current_question",
+    "adaptive_skipped", "last_evaluation", "start_time"
+]
+
+def get_storage_backend():
+    """Configured storage backend (shared by the whole process)"""
+    return storage.get_backend(AIConfig.STORAGE_BACKEND, DATABASE_PATH)
+
+def checkpoint_session():
+    """Persist the in-flight interview so a restarted worker can resume it"""
+    state = {key: st.session_state[key] for key in SESSION_CHECKPOINT_KEYS}
+    try:
+        get_storage_backend().save_session_state(st.session_state.session_id, state)
+    except Exception as e:
+        st.error(f"❌ Could not save interview progress: {e}")
+
+def clear_session_checkpoint():
+    try:
+        get_storage_backend().delete_session_state(st.session_state.session_id)
+    except Exception:
+        pass
 
 # Initialize Session State - FIXED FUNCTION
 def initialize_session_state():
     """Initialize all session state variables"""
+    # A new browser session carrying ?session=<id> resumes that interview
+    session_id = st.query_params.get("session")
+    restored = {}
+    if session_id and "session_id" not in st.session_state:
+        # Completed or abandoned interviews are never resumed; start a fresh session instead
+        if get_session_status(session_id)[0] not in (None, "in_progress"):
+            session_id = None
+        else:
+            try:
+                restored = get_storage_backend().load_session_state(session_id) or {}
+            except Exception as e:
+                st.error(f"❌ Could not restore the interview: {e}")
+                restored = {}
+    
     defaults = {
+        "session_id": session_id or uuid.uuid4().hex,
         "stage": "registration",
         "candidate_data": {},
         "generated_questions": [],
         "current_question": 0,
         "responses": [],
+        "adaptive_skipped": 0,
+        "last_evaluation": None,
         "start_time": time.time()
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
-            st.session_state[key] = value
+            st.session_state[key] = restored.get(key, value)
+    
+    if restored:
+        st.session_state.responses = load_session_responses(session_id)
+    
+    if st.query_params.get("session") != st.session_state.session_id:
+        st.query_params["session"] = st.session_state.session_id
 
 # Database Setup
+def ensure_column(cursor, table, column, declaration):
+    """Add a column to an existing table if an older database lacks it"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+# Full-text search indexes (FTS5 external-content tables kept in sync by triggers).
+# Every search term is a prefix query, so 2- and 3-character prefixes get their own index
+SEARCH_INDEXES = {
+    "candidates_fts": ("candidates", ["name", "email", "position", "skills"]),
+    "responses_fts": ("interview_responses", ["question", "answer", "feedback"])
+}
+
+def setup_search_index(cursor):
+    """Create FTS5 tables and sync triggers; returns False if FTS5 is unavailable"""
+    for fts_table, (table, columns) in SEARCH_INDEXES.items():
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = ?", (fts_table,))
+        row = cursor.fetchone()
+        exists = row is not None
+        
+        try:
+            # Tables created before the prefix indexes are rebuilt with them
+            if exists and "prefix=" not in row[0]:
+                cursor.execute(f"DROP TABLE {fts_table}")
+                exists = False
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {", ".join(columns)}, content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        column_list = ", ".join(columns)
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''')
+        
+        # Index rows that existed before the search table
+        if not exists:
+            cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    return True
+
+def build_search_query(text):
+    """FTS5 query matching every word of the input as a prefix"""
+    terms = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+def highlight_snippet(snippet):
+    """Escape a search snippet and turn its match markers into <mark> tags"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+def search_candidates(conn, text, page, page_size):
+    """Ranked candidate matches for one page, plus whether another page exists"""
+    query = build_search_query(text)
+    if not query:
+        return [], False
+    
+    rows = conn.execute('''
+    SELECT c.id, c.name, c.email, c.position, c.result_status, c.final_score,
+           snippet(candidates_fts, -1, char(2), char(3), '…', 12)
+    FROM candidates_fts
+    JOIN candidates c ON c.id = candidates_fts.rowid
+    WHERE candidates_fts MATCH ?
+    ORDER BY bm25(candidates_fts)
+    LIMIT ? OFFSET ?
+    ''', (query, page_size + 1, (page - 1) * page_size)).fetchall()
+    return rows[:page_size], len(rows) > page_size
+
+def search_responses(conn, text, page, page_size):
+    """Ranked answer matches for one page, plus whether another page exists"""
+    query = build_search_query(text)
+    if not query:
+        return [], False
+    
+    rows = conn.execute('''
+    SELECT r.id, COALESCE(c.name, 'Interview in progress'), r.skill, r.score,
+           snippet(responses_fts, 0, char(2), char(3), '…', 12),
+           snippet(responses_fts, -1, char(2), char(3), '…', 24)
+    FROM responses_fts
+    JOIN interview_responses r ON r.id = responses_fts.rowid
+    LEFT JOIN candidates c ON c.id = r.candidate_id
+    WHERE responses_fts MATCH ?
+    ORDER BY bm25(responses_fts)
+    LIMIT ? OFFSET ?
+    ''', (query, page_size + 1, (page - 1) * page_size)).fetchall()
+    return rows[:page_size], len(rows) > page_size
+
+def backfill_skill_ids(cursor):
+    """Resolve canonical skill ids for responses stored before they were recorded"""
+    labels = [row[0] for row in cursor.execute(
+        "SELECT DISTINCT skill FROM interview_responses WHERE skill_id IS NULL"
+    ).fetchall()]
+    cursor.executemany(
+        "UPDATE interview_responses SET skill_id = ? WHERE skill_id IS NULL AND skill = ?",
+        [(skills.canonical_skill(label)[0], label) for label in labels]
+    )
+
+def setup_similarity_index(cursor):
+    # similarity pulls in numpy, so it is imported where it is used
+    import similarity
+    similarity.setup_similarity_tables(cursor)
+
+def flag_similar_answers(cursor, response_id, answer, session_id=None, candidate_id=None):
+    """Check a saved answer against the pool; a failed check never blocks saving"""
+    import similarity
+    try:
+        return similarity.check_answer(cursor, response_id, answer, session_id, candidate_id)
+    except Exception:
+        return []
+
 @st.cache_resource
 def setup_database():
     """Setup SQLite database for storing results"""
     try:
-        conn = sqlite3.connect('hiring_skilled_candidates.db', check_same_thread=False)
+        conn = get_storage_backend().connect()
         cursor = conn.cursor()
         
         # Candidates table
@@ -200,6 +513,38 @@ def setup_database():
         )
         ''')
         
+        # In-flight and finished interviews; responses are appended per answer
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interview_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            candidate_email TEXT,
+            candidate_data TEXT,
+            status TEXT NOT NULL DEFAULT 'in_progress',
+            candidate_id INTEGER,
+            answered INTEGER DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        )
+        ''')
+        
+        # Columns added after the original schema
+        ensure_column(cursor, "interview_responses", "media_ref", "TEXT")
+        ensure_column(cursor, "interview_responses", "session_id", "TEXT")
+        ensure_column(cursor, "interview_responses", "speaking_quality", "TEXT")
+        ensure_column(cursor, "interview_responses", "skill_id", "TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_session ON interview_responses (session_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_skill ON interview_responses (skill_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_candidate ON interview_responses (candidate_id)")
+        backfill_skill_ids(cursor)
+        rubric.setup_rubric_tables(cursor)
+        archive.setup_archive_table(cursor)
+        setup_similarity_index(cursor)
+        question_bank.setup_question_bank_tables(cursor)
+        
+        setup_search_index(cursor)
+        
         conn.commit()
         cursor.close()
         return conn
@@ -208,19 +553,59 @@ def setup_database():
         return None
 
 # Perplexity AI Integration
-def call_perplexity_ai(prompt, model="llama-3.1-sonar-large-128k-online"):
-    """Advanced Perplexity AI integration"""
-    api_key = AIConfig.get_perplexity_api_key()
-    
-    if not api_key:
-        return "AI_DEMO_MODE"
+@st.cache_resource
+def get_http_session():
+    """Keep-alive HTTP session shared by every LLM call in this process"""
+    import requests
+    from requests.adapters import HTTPAdapter
     
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=AIConfig.LLM_MAX_CONCURRENCY))
+    return session
+
+@st.cache_resource
+def warm_up_process():
+    """Open the database and HTTP session in the background on the first page view"""
+    def warm():
+        setup_database()
+        get_http_session()
+        start_question_bank_warmup()
     
+    thread = threading.Thread(target=warm, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def get_llm_scheduler():
+    """Rate limiter and priority scheduler shared by all sessions in this process"""
+    return llm_scheduler.get_scheduler(AIConfig.LLM_RATE_PER_SECOND, AIConfig.LLM_BURST, AIConfig.LLM_MAX_CONCURRENCY)
+
+def get_llm_cassette():
+    """Record/replay cassette for LLM calls, None when recording and replay are off"""
+    if AIConfig.LLM_CASSETTE_MODE == "off":
+        return None
+    return llm_cassette.get_cassette(AIConfig.LLM_CASSETTE_PATH, AIConfig.LLM_CASSETTE_MODE,
+                                     AIConfig.LLM_CASSETTE_LATENCY_SCALE)
+
+def current_session_id():
+    """Session id for fair queuing; outside a Streamlit session all calls share one queue"""
+    try:
+        return st.session_state.get("session_id", "default")
+    except Exception:
+        return "default"
+
+def retry_after_seconds(response, attempt):
+    """Back-off delay for a 429, honouring the Retry-After header when present"""
+    try:
+        return max(1.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
+class LLMTimeoutError(Exception):
+    """LLM request not answered within AIConfig.LLM_QUEUE_TIMEOUT"""
+
+def call_perplexity_ai(prompt, model="llama-3.1-sonar-large-128k-online",
+                       priority=llm_scheduler.PRIORITY_INTERACTIVE, session_id=None, raise_timeout=False):
+    """Advanced Perplexity AI integration (raise_timeout: LLMTimeoutError instead of demo mode on timeout)"""
     payload = {
         "model": model,
         "messages": [
@@ -237,18 +622,70 @@ def call_perplexity_ai(prompt, model="llama-3.1-sonar-large-128k-online"):
         "temperature": 0.7
     }
     
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
-        else:
-            return "AI_DEMO_MODE"
-    except Exception as e:
+    # Replay serves recorded replies offline; a request missing from the cassette gets demo mode
+    cassette = get_llm_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        reply = cassette.replay(payload)
+        return reply if reply is not None else "AI_DEMO_MODE"
+    
+    api_key = AIConfig.get_perplexity_api_key()
+    
+    if not api_key:
+        return "AI_DEMO_MODE"
+    
+    url = "https://api.perplexity.ai/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    service_time = [0.0]
+    
+    def send():
+        started = time.perf_counter()
+        try:
+            return get_http_session().post(url, json=payload, headers=headers, timeout=30)
+        finally:
+            service_time[0] += time.perf_counter() - started
+    
+    scheduler = get_llm_scheduler()
+    session_id = session_id or current_session_id()
+    
+    def complete():
+        # Rate-limited responses are retried through the scheduler instead of
+        # dropping straight to demo mode
+        for attempt in range(AIConfig.LLM_MAX_RETRIES + 1):
+            future = scheduler.submit(send, priority, session_id)
+            try:
+                response = future.result(timeout=AIConfig.LLM_QUEUE_TIMEOUT)
+                if response.status_code == 200:
+                    return response.json()['choices'][0]['message']['content']
+                if response.status_code == 429 and attempt < AIConfig.LLM_MAX_RETRIES:
+                    scheduler.throttle(retry_after_seconds(response, attempt))
+                    continue
+                return "AI_DEMO_MODE"
+            except FutureTimeoutError:
+                # Still queued: drop it so nobody's rate budget is spent on an abandoned call
+                future.cancel()
+                if raise_timeout:
+                    raise LLMTimeoutError(f"No LLM reply within {AIConfig.LLM_QUEUE_TIMEOUT}s")
+                return "AI_DEMO_MODE"
+            except Exception as e:
+                return "AI_DEMO_MODE"
         return "AI_DEMO_MODE"
+    
+    reply = complete()
+    # Only real API replies are recorded; a demo-mode fallback (timeout, exhausted 429s, error)
+    # would otherwise replay as if the API had answered that way
+    if cassette is not None and reply != "AI_DEMO_MODE":
+        # Latency is time spent talking to the API, not waiting in the scheduler queue
+        cassette.record(payload, reply, service_time[0])
+    return reply
 
 # AI Question Generator
-def generate_ai_questions(skill, experience_level, num_questions=5):
-    """AI generates questions for ANY skill automatically"""
+def generate_ai_questions(skill, experience_level, num_questions=5, priority=llm_scheduler.PRIORITY_PREFETCH,
+                          fallback=True):
+    """AI generates questions for ANY skill automatically (unpadded, None without AI, when fallback is False)"""
     
     question_prompt = f"""
     Generate exactly {num_questions} technical interview questions for: "{skill}" at {experience_level} level.
@@ -269,10 +706,10 @@ def generate_ai_questions(skill, experience_level, num_questions=5):
     Generate {num_questions} questions for {skill} ({experience_level} level):
     """
     
-    ai_response = call_perplexity_ai(question_prompt)
+    ai_response = call_perplexity_ai(question_prompt, priority=priority)
     
     if ai_response == "AI_DEMO_MODE":
-        return generate_fallback_questions(skill, experience_level, num_questions)
+        return generate_fallback_questions(skill, experience_level, num_questions) if fallback else None
     
     # Parse AI response
     questions = []
@@ -291,12 +728,84 @@ def generate_ai_questions(skill, experience_level, num_questions=5):
             if len(question_text) > 20:
                 questions.append(question_text)
     
-    # Ensure we have enough questions
+    return pad_questions(questions, skill, num_questions) if fallback else questions[:num_questions]
+
+def pad_questions(questions, skill, num_questions):
+    """Exactly num_questions questions, topped up with a generic one"""
+    questions = list(questions)
     while len(questions) < num_questions:
         questions.append(f"Explain the core concepts and practical applications of {skill}.")
-    
     return questions[:num_questions]
 
+def get_skill_questions(skill_id, skill, experience_level, num_questions=5):
+    """Questions for a skill from the question bank, generated and banked on a miss"""
+    conn = setup_database()
+    if not conn:
+        return generate_ai_questions(skill, experience_level, num_questions)
+    
+    questions = question_bank.lookup(conn, skill_id, experience_level, num_questions,
+                                     AIConfig.QUESTION_BANK_MAX_AGE_DAYS)
+    with get_storage_backend().write_transaction() as write_conn:
+        question_bank.record_lookup(write_conn, questions is not None)
+    if questions is not None:
+        return questions
+    
+    questions = generate_ai_questions(skill, experience_level, num_questions, fallback=False)
+    if questions is None:
+        return generate_fallback_questions(skill, experience_level, num_questions)
+    # Only complete sets are banked; a short reply is padded for this candidate alone
+    if len(questions) < num_questions:
+        return pad_questions(questions, skill, num_questions)
+    with get_storage_backend().write_transaction() as write_conn:
+        question_bank.store(write_conn, skill_id, skill, experience_level, questions)
+    return questions
+
+def llm_queue_idle():
+    """True when no interactive or question requests are waiting for the LLM"""
+    queues = get_llm_scheduler().metrics()["queues"]
+    return all(queues[llm_scheduler.PRIORITY_NAMES[priority]]["depth"] == 0
+               for priority in (llm_scheduler.PRIORITY_INTERACTIVE, llm_scheduler.PRIORITY_PREFETCH))
+
+def run_question_bank_warmup(window):
+    """Background loop: keep the question bank warm for popular skills during idle periods"""
+    while True:
+        time.sleep(AIConfig.QUESTION_BANK_WARMUP_INTERVAL)
+        # One failed run must not end the loop for the life of the process
+        try:
+            if not AIConfig.get_perplexity_api_key() or not question_bank.in_warmup_hours(window):
+                continue
+            if not llm_queue_idle():
+                continue
+            
+            # The run commits as it goes, on this thread's own connection
+            setup_database()
+            conn = get_storage_backend().thread_connection()
+            write_lock = get_storage_backend().write_lock
+            # Workers share the bank, so only one of them runs each interval
+            run_id = question_bank.claim_run(conn, AIConfig.QUESTION_BANK_WARMUP_INTERVAL, write_lock)
+            if run_id is None:
+                continue
+            question_bank.warm(
+                conn,
+                lambda skill, level, n: generate_ai_questions(skill, level, n, llm_scheduler.PRIORITY_BATCH, fallback=False),
+                top_n=AIConfig.QUESTION_BANK_TOP_N, max_calls=AIConfig.QUESTION_BANK_WARMUP_CALLS,
+                call_interval=AIConfig.QUESTION_BANK_CALL_INTERVAL, max_age_days=AIConfig.QUESTION_BANK_MAX_AGE_DAYS,
+                write_lock=write_lock, is_idle=llm_queue_idle, run_id=run_id
+            )
+        except Exception:
+            pass
+
+@st.cache_resource
+def start_question_bank_warmup():
+    """Start the question bank warmup thread once per process (not at all with invalid warmup hours)"""
+    try:
+        window = question_bank.parse_warmup_hours(AIConfig.QUESTION_BANK_WARMUP_HOURS)
+    except ValueError:
+        return None
+    thread = threading.Thread(target=run_question_bank_warmup, args=(window,), name="question-bank-warmup", daemon=True)
+    thread.start()
+    return thread
+
 # Fallback questions
 def generate_fallback_questions(skill, experience_level, num_questions):
     """Generate fallback questions when AI is not available"""
@@ -332,7 +841,8 @@ def generate_fallback_questions(skill, experience_level, num_questions):
     return templates[level_key][:num_questions]
 
 # AI Answer Evaluation
-def evaluate_answer_with_ai(question, skill, experience_level, answer_text):
+def evaluate_answer_with_ai(question, skill, experience_level, answer_text,
+                            priority=llm_scheduler.PRIORITY_INTERACTIVE, session_id=None, raise_timeout=False):
     """AI-powered answer evaluation"""
     
     if not answer_text or len(answer_text.strip()) < 10:
@@ -358,7 +868,8 @@ def evaluate_answer_with_ai(question, skill, experience_level, answer_text):
     SPEAKING_QUALITY: [Beginner/Intermediate/Advanced/Fluent/Proficiency]
     """
     
-    ai_evaluation = call_perplexity_ai(evaluation_prompt)
+    ai_evaluation = call_perplexity_ai(evaluation_prompt, priority=priority, session_id=session_id,
+                                       raise_timeout=raise_timeout)
     
     if ai_evaluation == "AI_DEMO_MODE":
         return evaluate_fallback(answer_text, skill, experience_level)
@@ -407,17 +918,621 @@ def evaluate_fallback(answer_text, skill, experience_level):
     
     score = min(100, max(0, score + 25))  # Base score adjustment
     
-    if score >= 80:
-        feedback = ["Excellent technical response"]
-        speaking_quality = "Proficiency"
-    elif score >= 65:
-        feedback = ["Good technical understanding"]
-        speaking_quality = "Fluent"
+    speaking_quality, feedback = get_rubric().answer_level(score)
+    
+    return score, [feedback], speaking_quality
+
+# Adaptive Interview
+def estimate_skill_score(scores, total_questions):
+    """Running score estimate and confidence interval for one skill"""
+    n = len(scores)
+    if n == 0:
+        return None, 0.0, 100.0
+    
+    mean = sum(scores) / n
+    if n > 1:
+        variance = sum((s - mean) ** 2 for s in scores) / (n - 1)
     else:
-        feedback = ["Basic understanding shown"]
-        speaking_quality = "Intermediate"
+        variance = 0.0
+    sd = max(variance ** 0.5, AIConfig.ADAPTIVE_SCORE_SD_FLOOR)
+    
+    # Finite population correction: only total_questions answers can ever exist
+    if total_questions > 1 and n < total_questions:
+        fpc = ((total_questions - n) / (total_questions - 1)) ** 0.5
+    else:
+        fpc = 0.0
+    
+    half_width = AIConfig.ADAPTIVE_CONFIDENCE_Z * sd / (n ** 0.5) * fpc
+    return mean, max(0.0, mean - half_width), min(100.0, mean + half_width)
+
+def is_skill_settled(skill, questions, responses):
+    """True once the skill's hiring band can no longer change with more answers"""
+    scores = [r['score'] for r in responses if r['skill'] == skill and r['score'] > 0]
+    if len(scores) < AIConfig.ADAPTIVE_MIN_QUESTIONS:
+        return False
+    
+    total_questions = sum(1 for q in questions if q['skill'] == skill)
+    mean, low, high = estimate_skill_score(scores, total_questions)
+    return hiring_band(low) == hiring_band(high)
+
+def advance_to_next_question():
+    """Move to the next question, skipping skills whose band is already settled"""
+    questions = st.session_state.generated_questions
+    responses = st.session_state.responses
+    next_q = st.session_state.current_question + 1
+    
+    if AIConfig.ADAPTIVE_INTERVIEW:
+        settled = {}
+        while next_q < len(questions):
+            skill = questions[next_q]['skill']
+            if skill not in settled:
+                settled[skill] = is_skill_settled(skill, questions, responses)
+            if not settled[skill]:
+                break
+            st.session_state.adaptive_skipped += 1
+            next_q += 1
+    
+    st.session_state.current_question = next_q
+    if next_q >= len(questions):
+        st.session_state.stage = "results"
+    checkpoint_session()
+
+# Media Upload Pipeline
+class MediaUploadError(Exception):
+    """Rejected media upload (bad request or size cap exceeded)"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class MediaStore:
+    """Chunked, content-addressed storage for recorded audio/video"""
+    
+    UPLOAD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,100}$')
+    EXTENSIONS = {"audio/webm": "webm", "video/webm": "webm", "audio/ogg": "ogg",
+                  "audio/mp4": "m4a", "video/mp4": "mp4", "audio/wav": "wav"}
+    READ_SIZE = 64 * 1024
+    
+    def __init__(self, root, max_bytes, session_max_bytes=None, total_max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.session_max_bytes = session_max_bytes
+        self.total_max_bytes = total_max_bytes
+        self.incoming_dir = os.path.join(root, "incoming")
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.secret = self._load_secret()
+        
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.uploads = {}
+        self.completed = {}
+        self.on_complete = []
+        # session id -> (question on screen, when it was shown) and [bytes uploaded, last upload time]
+        self.questions = {}
+        self.session_bytes = {}
+        self.total_bytes = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for top in (self.incoming_dir, self.objects_dir) for directory, _, files in os.walk(top) for name in files
+        )
+    
+    def _load_secret(self):
+        """Key for upload tokens, shared by every worker process using this media directory"""
+        path = os.path.join(self.root, ".upload_secret")
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}"
+            with open(tmp_path, "wb") as f:
+                f.write(os.urandom(32))
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_path)
+        with open(path, "rb") as f:
+            return f.read()
+    
+    @staticmethod
+    def session_of(upload_id):
+        return upload_id.split("-", 1)[0]
+    
+    def upload_token(self, session_id):
+        """Token the recording component of one interview session sends with its uploads"""
+        return hmac.new(self.secret, session_id.encode(), hashlib.sha256).hexdigest()[:32]
+    
+    def check_token(self, upload_id, token):
+        if not hmac.compare_digest(self.upload_token(self.session_of(upload_id)), token or ""):
+            raise MediaUploadError("Invalid upload token", 403)
+    
+    def set_question(self, session_id, question_index):
+        """Question a session is answering; uploads started from now on are tagged with it"""
+        with self.lock:
+            self.questions[session_id] = (question_index, time.time())
+    
+    def _upload_state(self, upload_id):
+        if not self.UPLOAD_ID_PATTERN.match(upload_id):
+            raise MediaUploadError("Invalid upload id")
+        with self.lock:
+            state = self.uploads.get(upload_id)
+            if state is None:
+                session_id = self.session_of(upload_id)
+                state = {
+                    "path": os.path.join(self.incoming_dir, f"{upload_id}.part"),
+                    "session_id": session_id,
+                    "question": self.questions.get(session_id, (None, 0))[0],
+                    "next_seq": 0,
+                    "size": 0,
+                    "hasher": hashlib.sha256(),
+                    "lock": threading.Lock(),
+                    "updated_at": time.time()
+                }
+                self.uploads[upload_id] = state
+            return state
+    
+    def append_chunk(self, upload_id, seq, stream, length):
+        """Append one chunk to disk, streaming it through the hasher"""
+        if length < 0:
+            raise MediaUploadError("Invalid Content-Length")
+        state = self._upload_state(upload_id)
+        
+        with state["lock"]:
+            if seq != state["next_seq"]:
+                raise MediaUploadError(f"Expected chunk {state['next_seq']}, got {seq}", 409)
+            if state["size"] + length > self.max_bytes:
+                raise MediaUploadError("Recording exceeds size limit", 413)
+            
+            # Reserved before writing so concurrent uploads cannot overrun the quota together
+            with self.lock:
+                used = self.session_bytes.get(state["session_id"], [0, 0])[0]
+                if self.session_max_bytes and used + length > self.session_max_bytes:
+                    raise MediaUploadError("Recording quota of this interview exceeded", 413)
+                if self.total_max_bytes and self.total_bytes + length > self.total_max_bytes:
+                    raise MediaUploadError("Recording storage is full", 507)
+                self.session_bytes[state["session_id"]] = [used + length, time.time()]
+                self.total_bytes += length
+            
+            # A failed chunk is cut off the file and its reservation released, so the client can resend it
+            hasher = state["hasher"].copy()
+            try:
+                remaining = length
+                with open(state["path"], "ab") as f:
+                    while remaining > 0:
+                        data = stream.read(min(self.READ_SIZE, remaining))
+                        if not data:
+                            raise MediaUploadError("Incomplete chunk")
+                        f.write(data)
+                        hasher.update(data)
+                        remaining -= len(data)
+            except BaseException:
+                if os.path.exists(state["path"]):
+                    os.truncate(state["path"], state["size"])
+                with self.lock:
+                    self.session_bytes[state["session_id"]][0] -= length
+                    self.total_bytes -= length
+                raise
+            
+            state["hasher"] = hasher
+            state["size"] += length
+            state["next_seq"] += 1
+            state["updated_at"] = time.time()
+            return state["size"]
+    
+    def finalize(self, upload_id, mime_type):
+        """Move a finished upload to its content-addressed location"""
+        state = self._upload_state(upload_id)
+        
+        with state["lock"]:
+            if state["size"] == 0:
+                raise MediaUploadError("Empty recording")
+            
+            digest = state["hasher"].hexdigest()
+            extension = self.EXTENSIONS.get(mime_type.split(';')[0].strip(), "bin")
+            media_ref = f"{digest[:2]}/{digest}.{extension}"
+            target = os.path.join(self.objects_dir, media_ref)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            
+            # Identical recordings share one object
+            duplicate = os.path.exists(target)
+            if duplicate:
+                os.remove(state["path"])
+            else:
+                os.replace(state["path"], target)
+            
+            info = {
+                "upload_id": upload_id,
+                "session_id": state["session_id"],
+                "question": state["question"],
+                "media_ref": media_ref,
+                "path": target,
+                "size": state["size"],
+                "mime_type": mime_type,
+                "finished_at": time.time()
+            }
+        
+        with self.finished:
+            self.uploads.pop(upload_id, None)
+            self.completed[upload_id] = info
+            if duplicate:
+                self.total_bytes -= info["size"]
+            self.finished.notify_all()
+        
+        for callback in list(self.on_complete):
+            try:
+                callback(info)
+            except Exception:
+                pass
+        return info
+    
+    def latest_recording(self, session_id, question_index, claim=False, wait=0.0):
+        """Newest finished recording made for one question; claiming also drops older ones"""
+        # A recording of this question still uploading (e.g. its last chunk) is waited for up to `wait` seconds
+        deadline = time.time() + wait
+        with self.finished:
+            while True:
+                matches = [info for info in self.completed.values()
+                           if info["session_id"] == session_id and info["question"] == question_index]
+                uploading = any(state["session_id"] == session_id and state["question"] == question_index
+                                for state in self.uploads.values())
+                remaining = deadline - time.time()
+                if not uploading or remaining <= 0:
+                    break
+                self.finished.wait(remaining)
+            if claim:
+                for info in matches:
+                    del self.completed[info["upload_id"]]
+        if not matches:
+            return None
+        return max(matches, key=lambda info: info["finished_at"])
+    
+    def claim_latest(self, session_id, question_index, wait=0.0):
+        """Take the newest finished recording made for one question, dropping older ones"""
+        return self.latest_recording(session_id, question_index, claim=True, wait=wait)
+    
+    def compact(self, referenced_refs):
+        """Drop abandoned partial uploads and unreferenced objects"""
+        now = time.time()
+        removed = 0
+        
+        with self.lock:
+            stale = [upload_id for upload_id, state in self.uploads.items()
+                     if now - state["updated_at"] > AIConfig.MEDIA_STALE_UPLOAD_SECONDS]
+            for upload_id in stale:
+                state = self.uploads.pop(upload_id)
+                if os.path.exists(state["path"]):
+                    self.total_bytes -= os.path.getsize(state["path"])
+                    os.remove(state["path"])
+                    removed += 1
+            for upload_id in [u for u, info in self.completed.items()
+                              if now - info["finished_at"] > AIConfig.MEDIA_ORPHAN_SECONDS]:
+                del self.completed[upload_id]
+            for table in (self.questions, self.session_bytes):
+                for session_id in [s for s, entry in table.items() if now - entry[1] > AIConfig.MEDIA_ORPHAN_SECONDS]:
+                    del table[session_id]
+            pending_refs = {info["media_ref"] for info in self.completed.values()}
+            active_parts = {os.path.basename(state["path"]) for state in self.uploads.values()}
+        
+        # Partial files left behind by a previous process
+        for name in os.listdir(self.incoming_dir):
+            path = os.path.join(self.incoming_dir, name)
+            if name not in active_parts and now - os.path.getmtime(path) > AIConfig.MEDIA_STALE_UPLOAD_SECONDS:
+                self._remove(path)
+                removed += 1
+        
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                media_ref = f"{prefix}/{name}"
+                path = os.path.join(prefix_dir, name)
+                if media_ref in referenced_refs or media_ref in pending_refs:
+                    continue
+                if now - os.path.getmtime(path) > AIConfig.MEDIA_ORPHAN_SECONDS:
+                    self._remove(path)
+                    removed += 1
+        
+        return removed
+    
+    def _remove(self, path):
+        size = os.path.getsize(path)
+        os.remove(path)
+        with self.lock:
+            self.total_bytes -= size
+
+def make_media_upload_handler(store, allowed_origins, app_port):
+    """HTTP handler for chunked uploads: POST /upload/<id>/chunk?seq=N and /upload/<id>/finish"""
+    
+    class MediaUploadHandler(BaseHTTPRequestHandler):
+        def _allowed_origin(self):
+            """The request's Origin if it is the app's; without a configured list, the app port on this host"""
+            origin = (self.headers.get("Origin") or "").rstrip('/')
+            if allowed_origins:
+                return origin if origin in allowed_origins else None
+            parsed = urlparse(origin)
+            host = urlparse(f"//{self.headers.get('Host', '')}").hostname
+            if parsed.scheme in ("http", "https") and parsed.hostname == host and parsed.port == app_port:
+                return origin
+            return None
+        
+        def _send_cors(self):
+            origin = self._allowed_origin()
+            if origin:
+                self.send_header("Access-Control-Allow-Origin", origin)
+            self.send_header("Vary", "Origin")
+        
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self._send_cors()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self._send_cors()
+            self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.end_headers()
+        
+        def do_POST(self):
+            url = urlparse(self.path)
+            parts = url.path.strip('/').split('/')
+            params = parse_qs(url.query)
+            
+            try:
+                # Browsers send the page's origin; other sites' pages are refused before any work
+                if self.headers.get("Origin") and not self._allowed_origin():
+                    raise MediaUploadError("Origin not allowed", 403)
+                if len(parts) != 3 or parts[0] != "upload":
+                    raise MediaUploadError("Not found", 404)
+                upload_id, action = parts[1], parts[2]
+                store.check_token(upload_id, params.get("token", [""])[0])
+                length = int(self.headers.get("Content-Length", 0))
+                if length < 0:
+                    raise MediaUploadError("Invalid Content-Length")
+                
+                if action == "chunk":
+                    seq = int(params.get("seq", ["-1"])[0])
+                    size = store.append_chunk(upload_id, seq, self.rfile, length)
+                    self._send(200, {"size": size})
+                elif action == "finish":
+                    mime_type = params.get("mime", ["audio/webm"])[0]
+                    info = store.finalize(upload_id, mime_type)
+                    self._send(200, {"media_ref": info["media_ref"], "size": info["size"]})
+                else:
+                    raise MediaUploadError("Not found", 404)
+            except MediaUploadError as e:
+                self.close_connection = True
+                self._send(e.status, {"error": str(e)})
+            except (ValueError, OSError) as e:
+                self.close_connection = True
+                self._send(400, {"error": str(e)})
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return MediaUploadHandler
+
+def referenced_media_refs():
+    """media_ref values of live and archived answers"""
+    conn = get_storage_backend().connect()
+    try:
+        rows = conn.execute('''
+        SELECT media_ref FROM interview_responses WHERE media_ref IS NOT NULL
+        UNION SELECT media_ref FROM archived_media_refs
+        ''').fetchall()
+        return {row[0] for row in rows}
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+def run_media_compaction(store):
+    """Background compaction loop for the media store"""
+    while True:
+        time.sleep(AIConfig.MEDIA_COMPACTION_INTERVAL)
+        referenced = referenced_media_refs()
+        if referenced is not None:
+            try:
+                store.compact(referenced)
+            except OSError:
+                pass
+
+@st.cache_resource
+def get_media_store():
+    """Start the upload server and compaction thread once per process"""
+    store = MediaStore(AIConfig.MEDIA_DIR, AIConfig.MEDIA_MAX_BYTES,
+                       AIConfig.MEDIA_SESSION_MAX_BYTES, AIConfig.MEDIA_TOTAL_MAX_BYTES)
+    store.server = None
     
-    return score, feedback, speaking_quality
+    try:
+        server = ThreadingHTTPServer((AIConfig.MEDIA_UPLOAD_HOST, AIConfig.MEDIA_UPLOAD_PORT),
+                                     make_media_upload_handler(store, AIConfig.MEDIA_ALLOWED_ORIGINS,
+                                                               st.get_option("server.port")))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="media-upload-server", daemon=True).start()
+        store.server = server
+    except OSError:
+        pass
+    
+    threading.Thread(target=run_media_compaction, args=(store,), name="media-compaction", daemon=True).start()
+    
+    transcriber = get_transcription_queue()
+    if transcriber is not None:
+        store.on_complete.append(lambda info: transcriber.submit(info["media_ref"], info["path"]))
+    return store
+
+def claim_recording(question_index):
+    """media_ref of the recording made for a question, if any"""
+    store = get_media_store()
+    info = store.claim_latest(st.session_state.session_id, question_index)
+    return info["media_ref"] if info else None
+
+# Transcription Queue
+class TranscriptionQueue:
+    """Bounded queue feeding recorded answers to a pool of speech-to-text processes"""
+    
+    def __init__(self, workers, queue_size, batch_files):
+        self.batch_files = batch_files
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.slots = threading.BoundedSemaphore(workers)
+        import speech
+        
+        self.transcribe_batch = speech.transcribe_batch
+        threads_per_worker = max(1, (os.cpu_count() or workers) // workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=worker_process_context(),
+            initializer=speech.init_transcription_worker,
+            initargs=(AIConfig.TRANSCRIPTION_MODEL, threads_per_worker, AIConfig.TRANSCRIPTION_DECODE_BATCH)
+        )
+        
+        self.lock = threading.Lock()
+        self.results = OrderedDict()
+        self.events = {}
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.busy_since = None
+        self.active_batches = 0
+        self.completed = 0
+        self.dropped = 0
+        
+        threading.Thread(target=self._dispatch, name="transcription-dispatch", daemon=True).start()
+    
+    def submit(self, media_ref, path):
+        """Queue a recording; returns False if the queue is full"""
+        with self.lock:
+            if media_ref in self.events:
+                return True
+            self.events[media_ref] = threading.Event()
+        
+        try:
+            self.pending.put_nowait((media_ref, path))
+            return True
+        except queue.Full:
+            self._store(media_ref, {"text": "", "duration": 0.0, "error": "Transcription queue full"})
+            with self.lock:
+                self.dropped += 1
+            return False
+    
+    def wait(self, media_ref, timeout):
+        """Block until a recording's transcript is ready (or timeout)"""
+        with self.lock:
+            event = self.events.get(media_ref)
+        if event is None or not event.wait(timeout):
+            return None
+        with self.lock:
+            return self.results.get(media_ref)
+    
+    def _store(self, media_ref, result):
+        with self.lock:
+            self.results[media_ref] = result
+            event = self.events.get(media_ref)
+            while len(self.results) > AIConfig.TRANSCRIPTION_RESULT_CACHE:
+                old_ref, _ = self.results.popitem(last=False)
+                self.events.pop(old_ref, None)
+        if event is not None:
+            event.set()
+    
+    def _dispatch(self):
+        while True:
+            batch = [self.pending.get()]
+            # Short gather window so bursts of recordings share one worker call
+            while len(batch) < self.batch_files:
+                try:
+                    batch.append(self.pending.get(timeout=0.05))
+                except queue.Empty:
+                    break
+            
+            self.slots.acquire()
+            with self.lock:
+                if self.active_batches == 0:
+                    self.busy_since = time.time()
+                self.active_batches += 1
+            
+            try:
+                future = self.executor.submit(self.transcribe_batch, [path for _, path in batch])
+                future.add_done_callback(lambda f, batch=batch: self._finish(batch, f))
+            except Exception as e:
+                self._finish(batch, None, error=str(e))
+    
+    def _finish(self, batch, future, error=None):
+        try:
+            outputs = future.result() if future is not None else None
+        except Exception as e:
+            outputs, error = None, str(e)
+        if outputs is None:
+            outputs = [{"text": "", "duration": 0.0, "error": error} for _ in batch]
+        
+        for (media_ref, _), output in zip(batch, outputs):
+            self._store(media_ref, output)
+        
+        with self.lock:
+            self.audio_seconds += sum(output["duration"] for output in outputs)
+            self.completed += len(batch)
+            self.active_batches -= 1
+            if self.active_batches == 0:
+                self.busy_seconds += time.time() - self.busy_since
+                self.busy_since = None
+        self.slots.release()
+    
+    def metrics(self):
+        """Queue depth, totals and throughput (audio seconds per wall second)"""
+        with self.lock:
+            busy = self.busy_seconds
+            if self.busy_since is not None:
+                busy += time.time() - self.busy_since
+            return {
+                "queue_depth": self.pending.qsize(),
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "audio_seconds": self.audio_seconds,
+                "throughput": self.audio_seconds / busy if busy > 0 else 0.0
+            }
+
+@st.cache_resource
+def get_transcription_queue():
+    """Process-wide transcription pool, or None without a speech-to-text engine"""
+    import speech
+    
+    if not speech.transcription_available():
+        return None
+    return TranscriptionQueue(
+        AIConfig.TRANSCRIPTION_WORKERS,
+        AIConfig.TRANSCRIPTION_QUEUE_SIZE,
+        AIConfig.TRANSCRIPTION_BATCH_FILES
+    )
+
+def transcribe_recorded_answer(recording):
+    """Transcript of the recording made for the current question, if any"""
+    transcriber = get_transcription_queue()
+    if transcriber is None or recording is None:
+        return ""
+    
+    transcriber.submit(recording["media_ref"], recording["path"])
+    with st.spinner("🎧 Transcribing recorded answer..."):
+        result = transcriber.wait(recording["media_ref"], AIConfig.TRANSCRIPTION_TIMEOUT)
+    if not result or result["error"]:
+        return ""
+    return result["text"]
+
+def measure_speaking_quality(recording, transcript=""):
+    """Speech metrics of a recorded answer measured from its audio"""
+    if recording is None:
+        return None
+    
+    if not transcript:
+        transcriber = get_transcription_queue()
+        if transcriber is not None:
+            result = transcriber.wait(recording["media_ref"], 0)
+            if result and not result["error"]:
+                transcript = result["text"]
+    
+    try:
+        import speech
+        return speech.analyze_recording(recording["path"], transcript)
+    except Exception:
+        return None
 
 # Live Recording Component
 def render_live_recording():
@@ -457,6 +1572,35 @@ def render_live_recording():
     let mediaRecorder;
     let audioChunks = [];
     let mediaStream = null;
+    let uploadChain = Promise.resolve();
+    let uploadFailed = false;
+    
+    function uploadBase() {
+        if (UPLOAD_URL) return UPLOAD_URL;
+        let loc = window.location;
+        try { if (window.parent.location.hostname) loc = window.parent.location; } catch (e) {}
+        const protocol = loc.protocol === 'https:' ? 'https:' : 'http:';
+        return protocol + '//' + (loc.hostname || 'localhost') + ':' + UPLOAD_PORT;
+    }
+    
+    function queueUpload(path, body) {
+        // Chunks are sent one at a time and in order; the server appends them to disk
+        if (!UPLOAD_ENABLED) return uploadChain;
+        uploadChain = uploadChain.then(async () => {
+            if (uploadFailed) return;
+            const url = uploadBase() + path + (path.includes('?') ? '&' : '?') + 'token=' + UPLOAD_TOKEN;
+            const response = await fetch(url, { method: 'POST', body: body });
+            if (!response.ok) {
+                const result = await response.json().catch(() => ({}));
+                throw new Error(result.error || ('HTTP ' + response.status));
+            }
+        }).catch(error => {
+            uploadFailed = true;
+            if (mediaRecorder && mediaRecorder.state === 'recording') stopRecording();
+            document.getElementById('recordStatus').innerHTML = '❌ Upload failed: ' + error.message;
+        });
+        return uploadChain;
+    }
     
     async function startRecording() {
         try {
@@ -469,9 +1613,16 @@ def render_live_recording():
             
             mediaRecorder = new MediaRecorder(mediaStream);
             audioChunks = [];
+            uploadFailed = false;
+            
+            const uploadId = UPLOAD_SESSION + '-' + Date.now().toString(36);
+            let seq = 0;
             
             mediaRecorder.ondataavailable = event => {
-                if (event.data.size > 0) audioChunks.push(event.data);
+                if (event.data.size > 0) {
+                    audioChunks.push(event.data);
+                    queueUpload('/upload/' + uploadId + '/chunk?seq=' + (seq++), event.data);
+                }
             };
             
             mediaRecorder.onstop = () => {
@@ -479,10 +1630,22 @@ def render_live_recording():
                 const audioUrl = URL.createObjectURL(audioBlob);
                 document.getElementById('playback').src = audioUrl;
                 document.getElementById('playback').style.display = 'block';
-                document.getElementById('recordStatus').innerHTML = '✅ Recording Complete';
+                if (!UPLOAD_ENABLED) {
+                    document.getElementById('recordStatus').innerHTML = '⏹️ Recording kept in this browser only';
+                    return;
+                }
+                document.getElementById('recordStatus').innerHTML = '⏫ Uploading Recording...';
+                
+                const mime = encodeURIComponent(mediaRecorder.mimeType || 'audio/webm');
+                queueUpload('/upload/' + uploadId + '/finish?mime=' + mime, '').then(() => {
+                    if (!uploadFailed) {
+                        document.getElementById('recordStatus').innerHTML = '✅ Recording Complete & Saved';
+                    }
+                });
             };
             
-            mediaRecorder.start();
+            // Emit a chunk every second so uploads stream while recording
+            mediaRecorder.start(1000);
             document.getElementById('startRec').disabled = true;
             document.getElementById('stopRec').disabled = false;
             document.getElementById('stopRec').style.background = '#e74c3c';
@@ -505,53 +1668,192 @@ def render_live_recording():
         document.getElementById('startRec').disabled = false;
         document.getElementById('stopRec').disabled = true;
         document.getElementById('stopRec').style.background = '#95a5a6';
-        document.getElementById('recordStatus').innerHTML = '⏹️ Recording Stopped';
+        if (!uploadFailed) {
+            document.getElementById('recordStatus').innerHTML = '⏹️ Recording Stopped';
+        }
     }
     </script>
     """
     
-    st.components.v1.html(recording_html, height=500)
+    store = get_media_store()
+    upload_config = f"""
+    <script>
+    const UPLOAD_SESSION = {json.dumps(st.session_state.session_id)};
+    const UPLOAD_TOKEN = {json.dumps(store.upload_token(st.session_state.session_id))};
+    const UPLOAD_URL = {json.dumps(AIConfig.MEDIA_UPLOAD_URL)};
+    const UPLOAD_PORT = {AIConfig.MEDIA_UPLOAD_PORT};
+    const UPLOAD_ENABLED = {json.dumps(store.server is not None)};
+    </script>
+    """
+    # Uploads sent to another process could never be claimed by this session
+    if store.server is None:
+        st.warning(f"⚠️ This worker does not hold the recording upload port ({AIConfig.MEDIA_UPLOAD_PORT}) - "
+                   "recordings stay in the browser")
+    
+    st.components.v1.html(upload_config + recording_html, height=500)
 
 # Save to Database
-def save_interview_results(candidate_data, final_score, speaking_quality, result_status, responses, duration):
-    """Save comprehensive interview results to database"""
+def response_skill_id(response):
+    """Canonical skill id of a response, resolved from its label when not carried along"""
+    return response.get('skill_id') or skills.canonical_skill(response['skill'])[0]
+
+def insert_interview_records(cursor, candidate_data, final_score, speaking_quality, result_status, responses, duration):
+    """Insert one candidate row and its responses; returns the candidate id"""
+    rubric_version = rubric.register_rubric(cursor, get_rubric())
+    cursor.execute('''
+    INSERT INTO candidates (name, email, phone, position, experience, skills, final_score, speaking_quality, result_status, interview_duration, rubric_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        candidate_data['name'], candidate_data['email'], candidate_data['phone'],
+        candidate_data['position'], candidate_data['experience'], candidate_data['skills'],
+        final_score, speaking_quality, result_status, duration, rubric_version
+    ))
+    
+    candidate_id = cursor.lastrowid
+    
+    # Insert responses
+    cursor.executemany('''
+    INSERT INTO interview_responses (candidate_id, skill, skill_id, question, answer, score, feedback, response_time, media_ref, speaking_quality)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(
+        candidate_id, response['skill'], response_skill_id(response), response['question'], response['answer'],
+        response['score'], '; '.join(response['feedback']), response.get('response_time', 0),
+        response.get('media_ref'), response.get('speaking_quality')
+    ) for response in responses])
+    
+    if responses:
+        for response_id, answer in cursor.execute(
+            "SELECT id, answer FROM interview_responses WHERE candidate_id = ?", (candidate_id,)
+        ).fetchall():
+            flag_similar_answers(cursor, response_id, answer, candidate_id=candidate_id)
+    
+    return candidate_id
+
+def start_new_session():
+    """Give this browser a fresh interview session id"""
+    st.session_state.session_id = uuid.uuid4().hex
+    st.query_params["session"] = st.session_state.session_id
+
+def start_interview_session(session_id, candidate_data):
+    """Open an in-progress interview_sessions row at registration"""
+    if not setup_database():
+        return
+    
+    try:
+        with get_storage_backend().write_transaction() as conn:
+            # A finished session is never reopened or overwritten
+            conn.execute('''
+            INSERT INTO interview_sessions (session_id, candidate_email, candidate_data, status)
+            VALUES (?, ?, ?, 'in_progress')
+            ON CONFLICT(session_id) DO UPDATE SET
+                candidate_email = excluded.candidate_email, candidate_data = excluded.candidate_data,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE interview_sessions.status = 'in_progress'
+            ''', (session_id, candidate_data['email'], json.dumps(candidate_data)))
+    except Exception as e:
+        st.warning(f"⚠️ Could not record interview session: {e}")
+
+def record_response(session_id, response):
+    """Append one scored response as soon as it is evaluated; returns its row id"""
+    if not setup_database():
+        return None
+    
+    try:
+        with get_storage_backend().write_transaction() as conn:
+            cursor = conn.execute('''
+            INSERT INTO interview_responses (session_id, skill, skill_id, question, answer, score, feedback, response_time, media_ref, speaking_quality)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                session_id, response['skill'], response_skill_id(response), response['question'], response['answer'],
+                response['score'], '; '.join(response['feedback']), response.get('response_time', 0),
+                response.get('media_ref'), response.get('speaking_quality')
+            ))
+            flag_similar_answers(conn.cursor(), cursor.lastrowid, response['answer'], session_id)
+            conn.execute('''
+            UPDATE interview_sessions SET answered = answered + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE session_id = ?
+            ''', (session_id,))
+            return cursor.lastrowid
+    except Exception as e:
+        # The answer stays in the session and is written with the final results
+        st.error(f"❌ Could not save this answer to the database: {e}")
+        return None
+
+def load_session_responses(session_id):
+    """Responses already stored for an interview session, in answer order"""
+    conn = setup_database()
+    if not conn:
+        return []
+    
+    rows = conn.execute('''
+    SELECT id, skill, question, answer, score, feedback, response_time, media_ref, speaking_quality, skill_id
+    FROM interview_responses WHERE session_id = ? AND candidate_id IS NULL ORDER BY id
+    ''', (session_id,)).fetchall()
+    return [{
+        "id": row[0], "skill": row[1], "question": row[2], "answer": row[3], "score": row[4],
+        "feedback": row[5].split('; ') if row[5] else [], "response_time": row[6],
+        "media_ref": row[7], "speaking_quality": row[8] or "Intermediate", "skill_id": row[9]
+    } for row in rows]
+
+def get_session_status(session_id):
+    """(status, candidate_id) of an interview session, or (None, None)"""
     conn = setup_database()
     if not conn:
+        return None, None
+    row = conn.execute(
+        "SELECT status, candidate_id FROM interview_sessions WHERE session_id = ?", (session_id,)
+    ).fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+def mark_session_abandoned(session_id):
+    if not setup_database():
+        return
+    with get_storage_backend().write_transaction() as conn:
+        conn.execute('''
+        UPDATE interview_sessions SET status = 'abandoned', updated_at = CURRENT_TIMESTAMP
+        WHERE session_id = ? AND status = 'in_progress'
+        ''', (session_id,))
+
+def save_interview_results(candidate_data, final_score, speaking_quality, result_status, responses, duration, session_id=None):
+    """Save comprehensive interview results to database
+    
+    With a session_id the responses are already stored, so this only adds the
+    candidate row, links the session's scored responses to it and closes the session.
+    """
+    if not setup_database():
         return False
     
     try:
-        cursor = conn.cursor()
-        
-        # Check for duplicate
-        cursor.execute("SELECT id FROM candidates WHERE email = ?", (candidate_data['email'],))
-        if cursor.fetchone():
-            st.error("❌ Email already exists!")
-            return False
-        
-        # Insert candidate
-        cursor.execute('''
-        INSERT INTO candidates (name, email, phone, position, experience, skills, final_score, speaking_quality, result_status, interview_duration)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            candidate_data['name'], candidate_data['email'], candidate_data['phone'],
-            candidate_data['position'], candidate_data['experience'], candidate_data['skills'],
-            final_score, speaking_quality, result_status, duration
-        ))
-        
-        candidate_id = cursor.lastrowid
-        
-        # Insert responses
-        for response in responses:
-            cursor.execute('''
-            INSERT INTO interview_responses (candidate_id, skill, question, answer, score, feedback, response_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                candidate_id, response['skill'], response['question'], response['answer'],
-                response['score'], '; '.join(response['feedback']), response.get('response_time', 0)
-            ))
-        
-        conn.commit()
-        cursor.close()
+        with get_storage_backend().write_transaction() as conn:
+            cursor = conn.cursor()
+            # Check for duplicate
+            cursor.execute("SELECT id FROM candidates WHERE email = ?", (candidate_data['email'],))
+            if cursor.fetchone():
+                st.error("❌ Email already exists!")
+                return False
+            
+            if session_id is None:
+                candidate_id = insert_interview_records(
+                    cursor, candidate_data, final_score, speaking_quality, result_status, responses, duration
+                )
+            else:
+                # Answers whose save failed during the interview are written now
+                candidate_id = insert_interview_records(
+                    cursor, candidate_data, final_score, speaking_quality, result_status,
+                    [response for response in responses if not response.get("id")], duration
+                )
+                # Only scored answers belong to the final record, as before
+                cursor.execute('''
+                UPDATE interview_responses SET candidate_id = ?
+                WHERE session_id = ? AND candidate_id IS NULL AND score > 0
+                ''', (candidate_id, session_id))
+                cursor.execute("DELETE FROM interview_responses WHERE session_id = ? AND candidate_id IS NULL AND score <= 0",
+                               (session_id,))
+                cursor.execute('''
+                UPDATE interview_sessions SET status = 'completed', candidate_id = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
+                ''', (candidate_id, session_id))
+            cursor.close()
         st.success(f"✅ Interview results saved! Candidate ID: {candidate_id}")
         return True
         
@@ -559,9 +1861,477 @@ def save_interview_results(candidate_data, final_score, speaking_quality, result
         st.error(f"Database error: {e}")
         return False
 
+def add_response(response):
+    """Keep a scored response in the session and append it to the database right away"""
+    response["id"] = record_response(st.session_state.session_id, response)
+    st.session_state.responses.append(response)
+
+# Bulk Screening
+def run_screening(path, mode, progress=None):
+    """Screen a stored upload (background job)"""
+    import screening
+    return screening.run_batch(path, mode, progress=progress, mp_context=worker_process_context())
+
+def render_bulk_screening():
+    """Dashboard upload that screens a whole file of written submissions"""
+    with st.expander("📥 Bulk Candidate Screening"):
+        st.caption("CSV/XLSX with one row per answer: name, email, phone, position, experience, skills, skill, question, answer")
+        uploaded = st.file_uploader("Candidate answers file", type=["csv", "xlsx"])
+        mode = st.radio("Scoring", ["fallback", "ai"], horizontal=True, format_func=lambda m: {
+            "fallback": "⚡ Offline scoring (parallel)",
+            "ai": "🧠 AI scoring (rate-limited)"
+        }[m])
+        
+        job = get_background_job("screening")
+        running = job is not None and job.running
+        if uploaded is not None and st.button("🚀 Start Screening", type="primary", disabled=running):
+            # Name the stored copy by content so re-uploading after a crash resumes from its checkpoint
+            data = uploaded.getvalue()
+            extension = os.path.splitext(uploaded.name)[1].lower()
+            os.makedirs(AIConfig.BATCH_UPLOAD_DIR, exist_ok=True)
+            path = os.path.join(AIConfig.BATCH_UPLOAD_DIR, hashlib.sha256(data).hexdigest()[:16] + extension)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(data)
+            
+            start_background_job("screening", run_screening, path, mode)
+        
+        render_background_job(
+            "screening",
+            lambda c: f"⏳ {c['rows_done']} answers processed, {c['candidates_saved']} candidates saved" if c
+                      else "⏳ Screening started",
+            lambda c: f"screening complete, {c['candidates_saved']} candidates saved, "
+                      f"{c['candidates_skipped']} already in the database",
+            error_hint=" - upload the same file again to resume"
+        )
+
+# Scoring Rubric
+def rescore_with_active_rubric(version):
+    """Button callback: re-score stored candidates before the dashboard reruns"""
+    setup_database()
+    with get_storage_backend().write_transaction() as conn:
+        try:
+            archived = archive.read_archived_columns(
+                conn, AIConfig.ARCHIVE_DIR, ["candidate_id", "skill_id", "score", "speaking_quality"]
+            )
+        except RuntimeError as e:
+            # Re-scoring from live answers alone would overwrite archived candidates' scores
+            st.session_state.rubric_rescore = {"error": str(e)}
+            return
+        st.session_state.rubric_rescore = rubric.rescore_history(conn, get_rubric(), version, archived)
+    st.session_state.rubric_rescore["version"] = version
+
+def render_rubric_panel(conn):
+    """Active rubric version and re-scoring of candidates scored under older versions"""
+    active = get_rubric()
+    with get_storage_backend().write_transaction() as write_conn:
+        version = rubric.register_rubric(write_conn.cursor(), active)
+    stale = rubric.stale_candidates(conn, version)
+    error = rubric.rubric_error(AIConfig.RUBRIC_PATH)
+    
+    with st.expander(f"⚖️ Scoring Rubric v{version}" + (f" - {stale} candidates to re-score" if stale else "")
+                     + (" - rubric file rejected" if error else ""), expanded=bool(error)):
+        if error:
+            st.error(f"❌ Invalid rubric file, still scoring with v{version}: {error}")
+        result = st.session_state.pop("rubric_rescore", None)
+        if result and "error" in result:
+            st.error(f"❌ Re-score aborted: {result['error']}")
+        elif result:
+            st.success(f"✅ {result['candidates']} candidates re-scored under v{result['version']}, "
+                       f"{result['changed']} changed, in {result['seconds']:.1f}s")
+        
+        bands = " · ".join(f"{status} ≥ {min_score}" for min_score, status in active.definition["result_bands"])
+        st.caption(f"Result bands: {bands}")
+        if active.skill_weights:
+            st.caption("Skill weights: " + ", ".join(
+                f"{skills.skill_name(skill_id)} ×{weight:g}" for skill_id, weight in active.skill_weights.items()
+            ))
+        st.caption(f"Edit {AIConfig.RUBRIC_PATH} to change thresholds or weights; each change becomes a new version.")
+        
+        if stale:
+            st.button("♻️ Re-score history", type="primary", on_click=rescore_with_active_rubric, args=(version,))
+
+# Dashboard Search
+SEARCH_PAGE_SIZE = 20
+# Every page ranks all matches, so deep paging is capped; a narrower query finds the rest
+SEARCH_MAX_PAGES = 10
+
+def render_search(conn):
+    """Search box over candidates and interview answers"""
+    st.subheader("🔎 Search")
+    
+    col1, col2, col3 = st.columns([4, 2, 1])
+    with col1:
+        text = st.text_input("Search candidates and answers", placeholder="e.g. kubernetes, Akash, data engineer",
+                             label_visibility="collapsed")
+    with col2:
+        scope = st.radio("Search in", ["Candidates", "Answers"], horizontal=True, label_visibility="collapsed")
+    with col3:
+        page = st.number_input("Page", min_value=1, max_value=SEARCH_MAX_PAGES, value=1, step=1,
+                               label_visibility="collapsed")
+    
+    if not text.strip():
+        return
+    
+    started = time.perf_counter()
+    try:
+        if scope == "Candidates":
+            rows, has_more = search_candidates(conn, text, page, SEARCH_PAGE_SIZE)
+        else:
+            rows, has_more = search_responses(conn, text, page, SEARCH_PAGE_SIZE)
+    except sqlite3.OperationalError as e:
+        st.error(f"❌ Search unavailable: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    if has_more:
+        more = " (more on next page)" if page < SEARCH_MAX_PAGES else " (more matches - refine the search)"
+    else:
+        more = ""
+    st.caption(f"Page {page} · {len(rows)} results{more} · {elapsed_ms:.1f} ms")
+    
+    for row in rows:
+        if scope == "Candidates":
+            candidate_id, name, email, position, result_status, final_score, snippet = row
+            st.markdown(f"""
+            <div class="candidate-card">
+                <strong>👤 {html.escape(name)}</strong> · {html.escape(email)} · 💼 {html.escape(position)}
+                · <strong>{html.escape(result_status)}</strong> ({final_score}%)
+                <div style="color: #555; margin-top: 5px;">{highlight_snippet(snippet)}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            response_id, name, skill, score, question, snippet = row
+            st.markdown(f"""
+            <div class="candidate-card">
+                <strong>👤 {html.escape(name)}</strong> · 🛠️ {html.escape(skill)} · {score}%
+                <div style="margin-top: 5px;"><em>{highlight_snippet(question)}</em></div>
+                <div style="color: #555; margin-top: 5px;">{highlight_snippet(snippet)}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+def render_skill_analytics(conn):
+    """Average score per canonical skill across finished interviews, archived ones included"""
+    summary = archive.skill_summary(conn, AIConfig.ARCHIVE_DIR)
+    if not summary:
+        return
+    
+    st.subheader("🛠️ Skill Analytics")
+    st.dataframe([{
+        "Skill": skills.skill_name(skill_id),
+        "Candidates": candidates,
+        "Answers": answers,
+        "Avg Score": round(avg_score, 1)
+    } for skill_id, candidates, answers, avg_score in summary], use_container_width=True, hide_index=True)
+
+# Archive
+def archive_old_interviews():
+    """Button callback: move old answers to the Parquet archive before the dashboard reruns"""
+    setup_database()
+    # The run commits batch by batch, on a connection of its own
+    conn = get_storage_backend().connect()
+    try:
+        st.session_state.archive_result = archive.archive_responses(
+            conn, AIConfig.ARCHIVE_DIR, AIConfig.ARCHIVE_AFTER_DAYS, write_lock=get_storage_backend().write_lock
+        )
+    except RuntimeError as e:
+        st.session_state.archive_result = {"error": str(e)}
+    finally:
+        conn.close()
+
+def render_archive_panel(conn):
+    """Size of the live table and the archive, and the archival job"""
+    stats = archive.archive_stats(conn)
+    live_rows = conn.execute("SELECT COUNT(*) FROM interview_responses").fetchone()[0]
+    
+    with st.expander(f"🗄️ Archive - {live_rows} live answers, {stats['rows']} archived"):
+        result = st.session_state.pop("archive_result", None)
+        if result and "error" in result:
+            st.warning(f"⚠️ {result['error']}")
+        elif result:
+            st.success(f"✅ Archived {result['rows']} answers into {result['files']} files "
+                       f"({result['bytes'] / 1e6:.1f} MB) in {result['seconds']:.1f}s")
+        
+        st.caption(f"Answers of finished interviews older than {AIConfig.ARCHIVE_AFTER_DAYS} days move to "
+                   f"monthly Parquet files in {AIConfig.ARCHIVE_DIR}/ ({stats['files']} files, "
+                   f"{stats['bytes'] / 1e6:.1f} MB). Analytics and exports include them; search covers live answers.")
+        if not archive.archive_available():
+            st.caption("📦 Install pyarrow to enable archiving")
+        else:
+            st.button("🗄️ Archive old interviews", on_click=archive_old_interviews)
+
+# Background jobs
+def worker_process_context():
+    """Start method for process pools: forking the threaded server would copy locks held by other threads"""
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(start_method)
+
+class BackgroundJob:
+    """Long dashboard task on a daemon thread, so no session waits for it"""
+    
+    def __init__(self, name, target, args):
+        self.name = name
+        self.started_at = time.time()
+        self.finished_at = None
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(target, args), name=f"job-{name}", daemon=True)
+    
+    def _run(self, target, args):
+        try:
+            self.result = target(*args, progress=self._report)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+    
+    def _report(self, progress):
+        self.progress = progress
+    
+    @property
+    def running(self):
+        return self.finished_at is None
+
+@st.cache_resource
+def get_background_jobs():
+    """Latest job of each name, shared by every session of this process"""
+    return {}, threading.Lock()
+
+def start_background_job(name, target, *args):
+    """Run target(*args, progress=...) in the background unless a job of that name is still running"""
+    jobs, lock = get_background_jobs()
+    with lock:
+        job = jobs.get(name)
+        if job is not None and job.running:
+            return False
+        job = jobs[name] = BackgroundJob(name, target, args)
+        job.thread.start()
+    return True
+
+def get_background_job(name):
+    """Latest job of a name (running or finished), or None"""
+    jobs, lock = get_background_jobs()
+    with lock:
+        return jobs.get(name)
+
+@st.fragment(run_every=AIConfig.JOB_POLL_SECONDS)
+def render_background_job(name, describe_progress, describe_result, error_hint=""):
+    """Progress of a background job; reruns the page once when a job seen running finishes"""
+    job = get_background_job(name)
+    if job is None:
+        return
+    
+    seen = st.session_state.setdefault("background_jobs_seen", {})
+    was_running = seen.get(name) == (job.started_at, True)
+    seen[name] = (job.started_at, job.running)
+    if job.running:
+        st.info(describe_progress(job.progress))
+        return
+    if was_running:
+        st.rerun()
+    
+    finished = datetime.fromtimestamp(job.finished_at).strftime('%H:%M')
+    if job.error:
+        st.error(f"❌ Stopped at {finished}: {job.error}{error_hint}")
+    else:
+        st.success(f"✅ Finished at {finished}: {describe_result(job.result)}")
+
+# Similar answers
+def run_similarity_rebuild(progress=None):
+    """Re-sign every stored answer and flag near-duplicate pairs (background job)"""
+    import similarity
+    # The staging batches commit on their own connection, never inside another session's transaction
+    conn = get_storage_backend().connect()
+    try:
+        return similarity.rebuild_index(
+            conn, workers=AIConfig.SIMILARITY_WORKERS, progress=progress,
+            write_lock=get_storage_backend().write_lock, mp_context=worker_process_context()
+        )
+    finally:
+        conn.close()
+
+def rebuild_similarity_index():
+    """Button callback: start the similarity rebuild in the background"""
+    start_background_job("similarity", run_similarity_rebuild)
+
+def render_similar_answers(conn):
+    """Answers that nearly duplicate another candidate's answer"""
+    flags = conn.execute('''
+    SELECT f.similarity, r.skill, r.answer, m.answer,
+           COALESCE(rc.name, rs.candidate_email, 'Unknown'), COALESCE(mc.name, ms.candidate_email, 'Unknown')
+    FROM answer_flags f
+    JOIN interview_responses r ON r.id = f.response_id
+    JOIN interview_responses m ON m.id = f.matched_response_id
+    LEFT JOIN interview_sessions rs ON rs.session_id = r.session_id
+    LEFT JOIN interview_sessions ms ON ms.session_id = m.session_id
+    LEFT JOIN candidates rc ON rc.id = COALESCE(r.candidate_id, rs.candidate_id)
+    LEFT JOIN candidates mc ON mc.id = COALESCE(m.candidate_id, ms.candidate_id)
+    ORDER BY f.id DESC LIMIT 50
+    ''').fetchall()
+
+    with st.expander(f"🕵️ Similar Answers - {len(flags)} flagged" + (" (latest 50)" if len(flags) == 50 else "")):
+        render_background_job(
+            "similarity",
+            lambda signed: f"⏳ Rebuilding the similarity index: {signed or 0} answers signed",
+            lambda result: f"indexed {result['answers']} answers, checked {result['pairs']} candidate pairs, "
+                           f"flagged {result['flagged']} in {result['seconds']:.1f}s"
+        )
+
+        st.caption("New answers are compared with the pool as they are saved. "
+                   "Rebuild to re-check every live answer after an import or archive run.")
+        job = get_background_job("similarity")
+        st.button("🔁 Rebuild similarity index", on_click=rebuild_similarity_index,
+                  disabled=job is not None and job.running)
+
+        for similarity_score, skill, answer, matched_answer, name, matched_name in flags:
+            st.markdown(f"""
+            <div class="candidate-card">
+                <strong>👤 {html.escape(name)}</strong> ↔ <strong>👤 {html.escape(matched_name)}</strong>
+                · 🛠️ {html.escape(skill or '')} · {similarity_score * 100:.0f}% similar
+                <div style="color: #555; margin-top: 5px;">{html.escape((answer or '')[:200])}</div>
+                <div style="color: #888; margin-top: 5px;">{html.escape((matched_answer or '')[:200])}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+# Dashboard live sync
+def dashboard_signature(conn):
+    """Changes that rewrite rows the dashboard already holds: new rubric, re-scoring, archiving"""
+    return conn.execute('''
+    SELECT (SELECT MAX(version) FROM rubrics), (SELECT TOTAL(rescores) FROM rubrics),
+           (SELECT COUNT(*) FROM archive_partitions)
+    ''').fetchone()
+
+def candidate_stats(candidates_df):
+    """Running totals behind the dashboard metrics"""
+    return {
+        "total": len(candidates_df),
+        "hired": int(candidates_df['result_status'].str.contains('HIRED', na=False).sum()),
+        "score_sum": float(candidates_df['final_score'].sum()),
+        "days": candidates_df['created_at'].str[:10].value_counts().to_dict()
+    }
+
+def merge_candidate_stats(stats, delta):
+    days = dict(stats["days"])
+    for day, count in delta["days"].items():
+        days[day] = days.get(day, 0) + count
+    return {
+        "total": stats["total"] + delta["total"],
+        "hired": stats["hired"] + delta["hired"],
+        "score_sum": stats["score_sum"] + delta["score_sum"],
+        "days": days
+    }
+
+def sync_dashboard_data(conn):
+    """Dashboard frames for this session, updated with rows newer than the last ones seen"""
+    import pandas as pd
+    
+    data = st.session_state.get("dashboard_data")
+    # One read transaction, with every query bounded by max_candidate_id, so an interview
+    # saved mid-poll arrives whole on the next poll instead of partly on this one
+    conn.execute("BEGIN")
+    try:
+        signature = dashboard_signature(conn)
+        max_candidate_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM candidates").fetchone()[0]
+        
+        # Rows rewritten in place or removed cannot be patched from a delta: start over.
+        # shown_total None marks the lists below as drawn from data that no longer holds
+        if data is None or data["signature"] != signature or max_candidate_id < data["last_candidate_id"]:
+            data = {"signature": signature, "candidates": [], "responses": [], "stats": None,
+                    "last_candidate_id": 0, "last_response_id": 0, "shown_total": None}
+        
+        last_candidate_id, last_response_id = data["last_candidate_id"], data["last_response_id"]
+        new_candidates = pd.read_sql_query(
+            "SELECT * FROM candidates WHERE id > ? AND id <= ? ORDER BY created_at DESC", conn,
+            params=(last_candidate_id, max_candidate_id)
+        )
+        # Answers are linked to a candidate when the interview is saved, so they arrive
+        # with new candidates; later answers of known candidates are caught by id
+        new_responses = pd.read_sql_query("""
+            SELECT r.*, c.name as candidate_name 
+            FROM interview_responses r
+            JOIN candidates c ON r.candidate_id = c.id
+            WHERE (r.candidate_id > ? AND r.candidate_id <= ?) OR (r.id > ? AND r.candidate_id <= ?)
+            ORDER BY r.created_at DESC
+        """, conn, params=(last_candidate_id, max_candidate_id, last_response_id, last_candidate_id))
+    finally:
+        conn.rollback()
+    
+    # Deltas are kept as separate frames; copying the whole history on every poll
+    # would make the poll cost grow with it
+    if data["stats"] is None:
+        data["stats"] = candidate_stats(new_candidates)
+    elif len(new_candidates):
+        data["stats"] = merge_candidate_stats(data["stats"], candidate_stats(new_candidates))
+    if len(new_candidates) or not data["candidates"]:
+        data["candidates"].append(new_candidates)
+    if len(new_responses) or not data["responses"]:
+        data["responses"].append(new_responses)
+    
+    data["last_candidate_id"] = max_candidate_id
+    if len(new_responses):
+        data["last_response_id"] = max(last_response_id, int(new_responses['id'].max()))
+    st.session_state.dashboard_data = data
+    return data
+
+def dashboard_frames(data):
+    """Candidates and responses as single newest-first frames, merging the collected deltas"""
+    import pandas as pd
+    
+    for key in ("candidates", "responses"):
+        if len(data[key]) > 1:
+            data[key] = [pd.concat(data[key][::-1], ignore_index=True)]
+    return data["candidates"][0], data["responses"][0]
+
+dashboard_read_lock = threading.Lock()
+
+@st.cache_resource
+def get_dashboard_connection():
+    """Read-only connection shared by dashboard polls; the full page run sets up the schema"""
+    conn = get_storage_backend().connect()
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+@st.fragment(run_every=AIConfig.DASHBOARD_REFRESH_SECONDS or None)
+def render_dashboard_live():
+    """Metrics kept current by polling for new interviews; the lists below refresh on demand"""
+    with dashboard_read_lock:
+        data = sync_dashboard_data(get_dashboard_connection())
+    stats = data["stats"]
+    # A full page run draws the lists below from exactly this data
+    if st.session_state.pop("dashboard_redraw", False):
+        data["shown_total"] = stats["total"]
+    
+    if stats["total"] == 0:
+        st.info("📝 No candidates yet. Data will appear after interviews.")
+        return
+    
+    # Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("👥 Total Candidates", stats["total"])
+    with col2:
+        st.metric("✅ Hired", stats["hired"])
+    with col3:
+        st.metric("📊 Avg Score", f"{stats['score_sum'] / stats['total']:.1f}%")
+    with col4:
+        st.metric("📅 Today", stats["days"].get(datetime.now().strftime('%Y-%m-%d'), 0))
+    
+    if data["shown_total"] is None:
+        st.info("♻️ Scores or archived data changed since the lists below were drawn")
+        if st.button("🔄 Reload lists"):
+            st.rerun()
+    elif stats["total"] > data["shown_total"]:
+        st.info(f"🆕 {stats['total'] - data['shown_total']} new candidate(s) since the lists below were drawn")
+        if st.button("🔄 Show new candidates"):
+            st.rerun()
+
 # HR Dashboard
 def render_hr_dashboard():
     """HR Dashboard with complete data access"""
+    # pandas is only needed here, so candidates never pay for importing it
+    import pandas as pd
     
     st.markdown("""
     <div class="hr-dashboard">
@@ -570,43 +2340,28 @@ def render_hr_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
+    render_bulk_screening()
+    
     conn = setup_database()
     if not conn:
         st.error("❌ Database connection failed!")
         return
     
     try:
-        # Get candidates data
-        candidates_df = pd.read_sql_query("""
-            SELECT * FROM candidates ORDER BY created_at DESC
-        """, conn)
+        render_rubric_panel(conn)
+        render_archive_panel(conn)
         
-        # Get responses data
-        responses_df = pd.read_sql_query("""
-            SELECT r.*, c.name as candidate_name 
-            FROM interview_responses r
-            JOIN candidates c ON r.candidate_id = c.id
-            ORDER BY r.created_at DESC
-        """, conn)
+        # Candidates and responses held for this session; the live section reads only newer
+        # rows on each run and the lists below are drawn from what it read
+        st.session_state.dashboard_redraw = True
+        render_dashboard_live()
+        candidates_df, responses_df = dashboard_frames(st.session_state.dashboard_data)
         
         if len(candidates_df) == 0:
-            st.info("📝 No candidates yet. Data will appear after interviews.")
             return
         
-        # Metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("👥 Total Candidates", len(candidates_df))
-        with col2:
-            hired = len(candidates_df[candidates_df['result_status'].str.contains('HIRED', na=False)])
-            st.metric("✅ Hired", hired)
-        with col3:
-            avg_score = candidates_df['final_score'].mean()
-            st.metric("📊 Avg Score", f"{avg_score:.1f}%")
-        with col4:
-            today = len(candidates_df[candidates_df['created_at'].str.contains(datetime.now().strftime('%Y-%m-%d'), na=False)])
-            st.metric("📅 Today", today)
+        render_skill_analytics(conn)
+        render_similar_answers(conn)
         
         # Export buttons
         st.subheader("📤 Export Data")
@@ -616,10 +2371,15 @@ def render_hr_dashboard():
         with col1:
             if st.button("📊 Export to Excel", use_container_width=True):
                 output = io.BytesIO()
+                # Export archived answers together with the live ones
+                all_responses_df = archive.read_responses(conn, AIConfig.ARCHIVE_DIR).merge(
+                    candidates_df[['id', 'name']].rename(columns={'id': 'candidate_id', 'name': 'candidate_name'}),
+                    on='candidate_id'
+                ).sort_values('created_at', ascending=False)
                 with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
                     candidates_df.to_excel(writer, sheet_name='Candidates', index=False)
-                    if len(responses_df) > 0:
-                        responses_df.to_excel(writer, sheet_name='Responses', index=False)
+                    if len(all_responses_df) > 0:
+                        all_responses_df.to_excel(writer, sheet_name='Responses', index=False)
                 
                 st.download_button(
                     "💾 Download Excel File",
@@ -638,6 +2398,8 @@ def render_hr_dashboard():
                     mime="text/csv"
                 )
         
+        render_search(conn)
+        
         # Candidates display
         st.subheader(f"👥 All Candidates ({len(candidates_df)})")
         
@@ -689,11 +2451,236 @@ def render_hr_dashboard():
     
     except Exception as e:
         st.error(f"Dashboard error: {e}")
-    finally:
-        conn.close()
+
+# Interview Stage
+def rerun_interview():
+    """Rerun only the question fragment unless the interview has finished"""
+    if st.session_state.stage == "interview":
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Not inside a fragment rerun (e.g. first run after a full-app rerun)
+            st.rerun()
+    else:
+        st.rerun()
+
+@st.fragment
+def render_question_fragment():
+    """Question card and answer box - the only part updated between questions"""
+    questions = st.session_state.generated_questions
+    current_q = st.session_state.current_question
+    
+    if current_q >= len(questions):
+        st.session_state.stage = "results"
+        st.rerun()
+    
+    # Recordings started from here on belong to this question
+    get_media_store().set_question(st.session_state.session_id, current_q)
+    question_data = questions[current_q]
+    
+    # Progress
+    progress = (current_q + 1) / len(questions)
+    st.markdown(f"""
+    <div class="progress-bar">
+        <div class="progress-fill" style="width: {progress * 100}%;">
+            Question {current_q + 1} of {len(questions)} ({progress*100:.0f}%)
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.header(f"🤖 AI Question - {question_data['skill']}")
+    
+    # Question display
+    st.markdown(f"""
+    <div class="question-card">
+        <h3>🎯 Skill: {question_data['skill']}</h3>
+        <h4>📊 Level: {question_data['difficulty']}</h4>
+        <h4>⏰ Time: {question_data['time_limit']}s</h4>
+        <hr>
+        <h3>❓ AI-Generated Question:</h3>
+        <p style="font-size: 20px; font-weight: bold; color: #2c3e50;">
+            {question_data['question']}
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Timer
+    st.markdown(f"""
+    <div class="timer-display" id="timer-{current_q}">
+        ⏰ Time: <span id="countdown-{current_q}">{question_data['time_limit']}</span>s
+    </div>
+    <script>
+    var timeLeft_{current_q} = {question_data['time_limit']};
+    var timer_{current_q} = setInterval(function(){{
+        timeLeft_{current_q}--;
+        var el = document.getElementById('countdown-{current_q}');
+        if (el) {{
+            el.innerHTML = timeLeft_{current_q};
+            if (timeLeft_{current_q} <= 0) {{
+                clearInterval(timer_{current_q});
+                el.innerHTML = 'TIME UP!';
+            }}
+        }}
+    }}, 1000);
+    </script>
+    """, unsafe_allow_html=True)
+    
+    evaluation = st.session_state.get("last_evaluation")
+    if evaluation and evaluation["question_index"] == current_q:
+        render_evaluation(evaluation, question_data, questions, current_q)
+        
+        if st.button("Continue →", type="primary", key=f"continue_{current_q}"):
+            st.session_state.last_evaluation = None
+            advance_to_next_question()
+            rerun_interview()
+        return
+    
+    # Answer input
+    col1, col2 = st.columns([5, 1])
+    
+    with col1:
+        answer_text = st.text_area(
+            f"Your answer for {question_data['skill']}:",
+            height=150,
+            placeholder="Provide detailed technical answer...",
+            key=f"answer_{current_q}"
+        )
+    
+    with col2:
+        if st.button("⏭️ Skip", key=f"skip_{current_q}"):
+            add_response({
+                "skill": question_data["skill"],
+                "skill_id": question_data.get("skill_id"),
+                "question": question_data["question"],
+                "answer": "SKIPPED",
+                "score": 0,
+                "feedback": ["Skipped"],
+                "response_time": 0,
+                "media_ref": claim_recording(current_q)
+            })
+            
+            advance_to_next_question()
+            rerun_interview()
+    
+    # Submit
+    if st.button("🤖 SUBMIT FOR AI EVALUATION", type="primary", key=f"submit_{current_q}"):
+        recording = get_media_store().latest_recording(
+            st.session_state.session_id, current_q, wait=AIConfig.MEDIA_FINISH_WAIT_SECONDS
+        )
+        transcript = ""
+        
+        # A recorded spoken answer stands in for an empty typed one
+        if not answer_text or len(answer_text.strip()) < 15:
+            transcript = transcribe_recorded_answer(recording)
+            answer_text = transcript
+        
+        if not answer_text or len(answer_text.strip()) < 15:
+            st.error("❌ Answer too short!")
+        else:
+            with st.spinner("🤖 AI evaluating response..."):
+                score, feedback, speaking_quality = evaluate_answer_with_ai(
+                    question_data['question'],
+                    question_data['skill'],
+                    question_data['difficulty'],
+                    answer_text
+                )
+                
+                # Measured speech replaces the LLM's guessed speaking quality
+                speech_metrics = measure_speaking_quality(recording, transcript)
+                if speech_metrics:
+                    speaking_quality = speech_metrics["speaking_quality"]
+                
+                add_response({
+                    "skill": question_data["skill"],
+                    "skill_id": question_data.get("skill_id"),
+                    "question": question_data["question"],
+                    "answer": answer_text,
+                    "score": score,
+                    "feedback": feedback,
+                    "speaking_quality": speaking_quality,
+                    "response_time": 30,
+                    "media_ref": claim_recording(current_q),
+                    "speech_metrics": speech_metrics
+                })
+                
+                st.session_state.last_evaluation = {
+                    "question_index": current_q,
+                    "score": score,
+                    "feedback": feedback,
+                    "speaking_quality": speaking_quality,
+                    "speech_metrics": speech_metrics
+                }
+                checkpoint_session()
+            rerun_interview()
+
+def render_evaluation(evaluation, question_data, questions, current_q):
+    """Show the AI evaluation of the answer just submitted"""
+    score = evaluation["score"]
+    feedback = evaluation["feedback"]
+    speaking_quality = evaluation["speaking_quality"]
+    
+    if score >= 80:
+        st.success(f"🏆 OUTSTANDING! Score: {score}%")
+    elif score >= 65:
+        st.success(f"✅ EXCELLENT! Score: {score}%")
+    elif score >= 50:
+        st.info(f"👍 GOOD! Score: {score}%")
+    else:
+        st.warning(f"📈 NEEDS IMPROVEMENT! Score: {score}%")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("AI Score", f"{score}%")
+    with col2:
+        st.metric("Quality", speaking_quality)
+    with col3:
+        remaining = len(questions) - current_q - 1
+        st.metric("Left", remaining)
+    
+    for i, fb in enumerate(feedback, 1):
+        st.info(f"{i}. {fb}")
+    
+    speech_metrics = evaluation.get("speech_metrics")
+    if speech_metrics:
+        details = [f"{speech_metrics['pause_ratio'] * 100:.0f}% pauses"]
+        if speech_metrics["wpm"] is not None:
+            details.insert(0, f"{speech_metrics['wpm']:.0f} words/min")
+            details.append(f"{speech_metrics['filler_rate']:.1f} fillers per 100 words")
+        if speech_metrics.get("pitch_std_semitones") is not None:
+            details.append(f"{speech_metrics['pitch_std_semitones']:.1f} semitone pitch spread")
+        st.caption("🗣️ Measured speech: " + " · ".join(details))
+    
+    if AIConfig.ADAPTIVE_INTERVIEW:
+        skill = question_data['skill']
+        skill_scores = [r['score'] for r in st.session_state.responses
+                        if r['skill'] == skill and r['score'] > 0]
+        skill_total = sum(1 for q in questions if q['skill'] == skill)
+        mean, low, high = estimate_skill_score(skill_scores, skill_total)
+        if mean is not None:
+            st.caption(f"📐 {skill} estimate: {mean:.0f}% (range {low:.0f}-{high:.0f}%)")
+        if is_skill_settled(skill, questions, st.session_state.responses):
+            st.caption(f"⚡ {skill} result is settled - remaining {skill} questions will be skipped")
+
+def render_interview_stage():
+    """Interview stage: question fragment plus a recording widget that stays mounted"""
+    if st.session_state.current_question >= len(st.session_state.generated_questions):
+        st.session_state.stage = "results"
+        st.rerun()
+    
+    # Only this fragment reruns between questions; the recording component
+    # below is rendered by full-app runs only, so its iframe and media
+    # streams are not torn down on every answer.
+    render_question_fragment()
+    
+    # Recording
+    render_live_recording()
 
 # Main Application
 def main():
+    render_page_chrome()
+    warm_up_process()
+    render_sidebar_info()
+    
     # Initialize session state - MOVED TO TOP
     initialize_session_state()
     
@@ -739,9 +2726,9 @@ def main():
                         "INTERMEDIATE (2-5 years)",
                         "ADVANCED (5+ years)"
                     ])
-                    skills = st.text_area("🛠️ Technical Skills*", 
-                                        placeholder="Enter ANY skills: Python, React, AWS, Machine Learning, etc.",
-                                        height=100)
+                    skills_text = st.text_area("🛠️ Technical Skills*", 
+                                             placeholder="Enter ANY skills: Python, React, AWS, Machine Learning, etc.",
+                                             height=100)
                 
                 consent1 = st.checkbox("🎙️ I have working microphone")
                 consent2 = st.checkbox("📹 I have working camera")
@@ -756,25 +2743,23 @@ def main():
                     if not email or "@" not in email: missing.append("Email")
                     if not phone: missing.append("Phone")
                     if not position: missing.append("Position")
-                    if not skills: missing.append("Skills")
+                    if not skills.parse_skills(skills_text, limit=1): missing.append("Skills")
                     if not all([consent1, consent2, consent3, consent4]): missing.append("All Consents")
                     
                     if missing:
                         st.error(f"❌ Please complete: {', '.join(missing)}")
                     else:
                         with st.spinner("🤖 AI generating personalized questions..."):
-                            time.sleep(3)
-                            
-                            exp_level = experience.split('(')[0].strip()
-                            skills_list = [s.strip() for s in skills.replace(',', '\n').split('\n') if s.strip()]
-                            unique_skills = list(set([s.lower() for s in skills_list if len(s) > 2]))[:5]
+                            exp_level = question_bank.experience_level(experience)
+                            unique_skills = skills.parse_skills(skills_text, limit=5)
                             
                             all_questions = []
-                            for skill in unique_skills:
-                                ai_questions = generate_ai_questions(skill, exp_level, 5)
+                            for skill_id, skill in unique_skills:
+                                ai_questions = get_skill_questions(skill_id, skill, exp_level)
                                 for i, q in enumerate(ai_questions, 1):
                                     all_questions.append({
-                                        "skill": skill.title(),
+                                        "skill": skill,
+                                        "skill_id": skill_id,
                                         "question": f"Q{i}: {q}",
                                         "difficulty": exp_level,
                                         "time_limit": AIConfig.TECHNICAL_TIME
@@ -786,7 +2771,7 @@ def main():
                                 "phone": phone.strip(),
                                 "position": position.strip(),
                                 "experience": experience,
-                                "skills": ', '.join([s.title() for s in unique_skills])
+                                "skills": ', '.join(skill for _, skill in unique_skills)
                             }
                             st.session_state.generated_questions = all_questions
                             
@@ -794,149 +2779,15 @@ def main():
                             st.info(f"🎯 Generated {len(all_questions)} questions for {len(unique_skills)} skills")
                             
                             st.session_state.stage = "interview"
-                            time.sleep(1)
+                            if get_session_status(st.session_state.session_id)[0] not in (None, "in_progress"):
+                                start_new_session()
+                            start_interview_session(st.session_state.session_id, st.session_state.candidate_data)
+                            checkpoint_session()
                             st.rerun()
         
         # STAGE 2: Interview
         elif st.session_state.stage == "interview":
-            questions = st.session_state.generated_questions
-            current_q = st.session_state.current_question
-            
-            if current_q < len(questions):
-                question_data = questions[current_q]
-                
-                # Progress
-                progress = (current_q + 1) / len(questions)
-                st.markdown(f"""
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width: {progress * 100}%;">
-                        Question {current_q + 1} of {len(questions)} ({progress*100:.0f}%)
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.header(f"🤖 AI Question - {question_data['skill']}")
-                
-                # Question display
-                st.markdown(f"""
-                <div class="question-card">
-                    <h3>🎯 Skill: {question_data['skill']}</h3>
-                    <h4>📊 Level: {question_data['difficulty']}</h4>
-                    <h4>⏰ Time: {question_data['time_limit']}s</h4>
-                    <hr>
-                    <h3>❓ AI-Generated Question:</h3>
-                    <p style="font-size: 20px; font-weight: bold; color: #2c3e50;">
-                        {question_data['question']}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Timer
-                st.markdown(f"""
-                <div class="timer-display" id="timer-{current_q}">
-                    ⏰ Time: <span id="countdown-{current_q}">{question_data['time_limit']}</span>s
-                </div>
-                <script>
-                var timeLeft_{current_q} = {question_data['time_limit']};
-                var timer_{current_q} = setInterval(function(){{
-                    timeLeft_{current_q}--;
-                    var el = document.getElementById('countdown-{current_q}');
-                    if (el) {{
-                        el.innerHTML = timeLeft_{current_q};
-                        if (timeLeft_{current_q} <= 0) {{
-                            clearInterval(timer_{current_q});
-                            el.innerHTML = 'TIME UP!';
-                        }}
-                    }}
-                }}, 1000);
-                </script>
-                """, unsafe_allow_html=True)
-                
-                # Recording
-                render_live_recording()
-                
-                # Answer input
-                col1, col2 = st.columns([5, 1])
-                
-                with col1:
-                    answer_text = st.text_area(
-                        f"Your answer for {question_data['skill']}:",
-                        height=150,
-                        placeholder="Provide detailed technical answer...",
-                        key=f"answer_{current_q}"
-                    )
-                
-                with col2:
-                    if st.button("⏭️ Skip", key=f"skip_{current_q}"):
-                        st.session_state.responses.append({
-                            "skill": question_data["skill"],
-                            "question": question_data["question"],
-                            "answer": "SKIPPED",
-                            "score": 0,
-                            "feedback": ["Skipped"],
-                            "response_time": 0
-                        })
-                        
-                        st.session_state.current_question += 1
-                        if current_q >= len(questions) - 1:
-                            st.session_state.stage = "results"
-                        st.rerun()
-                
-                # Submit
-                if st.button("🤖 SUBMIT FOR AI EVALUATION", type="primary"):
-                    if not answer_text or len(answer_text.strip()) < 15:
-                        st.error("❌ Answer too short!")
-                    else:
-                        with st.spinner("🤖 AI evaluating response..."):
-                            time.sleep(3)
-                            
-                            score, feedback, speaking_quality = evaluate_answer_with_ai(
-                                question_data['question'],
-                                question_data['skill'],
-                                question_data['difficulty'],
-                                answer_text
-                            )
-                            
-                            st.session_state.responses.append({
-                                "skill": question_data["skill"],
-                                "question": question_data["question"],
-                                "answer": answer_text,
-                                "score": score,
-                                "feedback": feedback,
-                                "speaking_quality": speaking_quality,
-                                "response_time": 30
-                            })
-                            
-                            # Display results
-                            if score >= 80:
-                                st.success(f"🏆 OUTSTANDING! Score: {score}%")
-                            elif score >= 65:
-                                st.success(f"✅ EXCELLENT! Score: {score}%")
-                            elif score >= 50:
-                                st.info(f"👍 GOOD! Score: {score}%")
-                            else:
-                                st.warning(f"📈 NEEDS IMPROVEMENT! Score: {score}%")
-                            
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("AI Score", f"{score}%")
-                            with col2:
-                                st.metric("Quality", speaking_quality)
-                            with col3:
-                                remaining = len(questions) - current_q - 1
-                                st.metric("Left", remaining)
-                            
-                            for i, fb in enumerate(feedback, 1):
-                                st.info(f"{i}. {fb}")
-                            
-                            if st.button("Continue →", type="primary"):
-                                st.session_state.current_question += 1
-                                if current_q >= len(questions) - 1:
-                                    st.session_state.stage = "results"
-                                st.rerun()
-            else:
-                st.session_state.stage = "results"
-                st.rerun()
+            render_interview_stage()
         
         # STAGE 3: Results
         elif st.session_state.stage == "results":
@@ -947,34 +2798,10 @@ def main():
             duration = (time.time() - st.session_state.start_time) / 60
             
             # Calculate scores
-            valid_responses = [r for r in responses if r['score'] > 0]
-            
-            if valid_responses:
-                final_score = int(sum(r['score'] for r in valid_responses) / len(valid_responses))
-                
-                speaking_qualities = [r.get('speaking_quality', 'Intermediate') for r in valid_responses]
-                quality_scores = {'Beginner': 1, 'Intermediate': 2, 'Advanced': 3, 'Fluent': 4, 'Proficiency': 5}
-                avg_quality = sum(quality_scores.get(sq, 2) for sq in speaking_qualities) / len(speaking_qualities)
-                
-                if avg_quality >= 4.5: speaking_quality = "Proficiency"
-                elif avg_quality >= 3.5: speaking_quality = "Fluent"
-                elif avg_quality >= 2.5: speaking_quality = "Advanced"
-                else: speaking_quality = "Intermediate"
-            else:
-                final_score = 0
-                speaking_quality = "Beginner"
+            final_score, speaking_quality, valid_responses = compute_final_assessment(responses)
             
             # Determine result
-            if final_score >= 80:
-                result_status, emoji, color = "HIRED - OUTSTANDING", "🏆", "#27ae60"
-            elif final_score >= 70:
-                result_status, emoji, color = "HIRED - EXCELLENT", "🌟", "#27ae60"
-            elif final_score >= 60:
-                result_status, emoji, color = "HIRED - GOOD", "✅", "#27ae60"
-            elif final_score >= 45:
-                result_status, emoji, color = "UNDER REVIEW", "⏳", "#f39c12"
-            else:
-                result_status, emoji, color = "NOT SELECTED", "❌", "#e74c3c"
+            result_status, emoji, color = determine_result(final_score)
             
             # Display results
             st.markdown(f"""
@@ -1003,23 +2830,33 @@ def main():
                 st.metric("Final Score", f"{final_score}%")
                 st.metric("Speaking Quality", speaking_quality)
                 st.metric("Questions Done", f"{len(valid_responses)}/{len(st.session_state.generated_questions)}")
+                if st.session_state.adaptive_skipped:
+                    st.caption(f"⚡ {st.session_state.adaptive_skipped} questions skipped (result already settled)")
                 st.metric("Interview Result", result_status.split('-')[0])
             
-            # Save to database
-            with st.spinner("💾 Saving to database..."):
-                time.sleep(2)
-                save_success = save_interview_results(
-                    candidate, final_score, speaking_quality, 
-                    result_status, valid_responses, duration
-                )
-                
-                if save_success:
-                    st.balloons()
+            # Finalize the session - responses were saved as they were scored
+            session_status, candidate_id = get_session_status(st.session_state.session_id)
+            if session_status == "completed":
+                st.success(f"✅ Interview results saved! Candidate ID: {candidate_id}")
+            else:
+                with st.spinner("💾 Saving to database..."):
+                    save_success = save_interview_results(
+                        candidate, final_score, speaking_quality, 
+                        result_status, valid_responses, duration,
+                        session_id=st.session_state.session_id
+                    )
+                    
+                    if save_success:
+                        clear_session_checkpoint()
+                        st.balloons()
             
             # New interview
             if st.button("🔄 New Interview", type="primary"):
+                mark_session_abandoned(st.session_state.session_id)
+                clear_session_checkpoint()
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
+                start_new_session()
                 st.rerun()
     
     elif page == "👥 HR Dashboard":
@@ -1042,36 +2879,107 @@ def main():
             db = setup_database()
             db_status = "🟢 Ready" if db else "🔴 Error"
             st.metric("💾 Database", db_status)
+            st.caption(f"Backend: {AIConfig.STORAGE_BACKEND}")
         
         with col4:
             st.metric("🚀 System", "🟢 OPERATIONAL")
+        
+        st.subheader("🧠 LLM Request Scheduler")
+        scheduler_metrics = get_llm_scheduler().metrics()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("⏱️ Rate Limit", f"{scheduler_metrics['rate_per_second']:g}/s")
+        with col2:
+            st.metric("✅ Calls Made", scheduler_metrics['completed'])
+        with col3:
+            st.metric("🚦 Rate-Limited", scheduler_metrics['throttled'])
+        with col4:
+            st.metric("📥 Queued", sum(q['depth'] for q in scheduler_metrics['queues'].values()))
+        
+        st.table([{
+            "Priority": name.title(),
+            "Queued": queue_metrics['depth'],
+            "Sessions Waiting": queue_metrics['sessions'],
+            "Avg Wait (s)": f"{queue_metrics['avg_wait']:.2f}",
+            "P95 Wait (s)": f"{queue_metrics['p95_wait']:.2f}"
+        } for name, queue_metrics in scheduler_metrics['queues'].items()])
+        
+        cassette = get_llm_cassette()
+        if cassette is not None:
+            cassette_metrics = cassette.metrics()
+            st.caption(f"🎞️ LLM cassette ({cassette_metrics['mode']}): {cassette_metrics['path']} - "
+                       f"{cassette_metrics['replies']} replies for {cassette_metrics['requests']} requests, "
+                       f"{cassette_metrics['hits']} replayed, {cassette_metrics['misses']} missing, "
+                       f"{cassette_metrics['recorded']} recorded")
+
+        st.subheader("📚 Question Bank")
+        if db:
+            lookups = question_bank.hit_rate(db)
+            bank = question_bank.bank_stats(db)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                rate = lookups['rate']
+                st.metric("🎯 Hit Rate (7 days)", f"{rate * 100:.0f}%" if rate is not None else "-")
+            with col2:
+                st.metric("✅ Hits / ❌ Misses", f"{lookups['hits']} / {lookups['misses']}")
+            with col3:
+                st.metric("📦 Banked Sets", bank['entries'])
+            with col4:
+                last_run = bank['last_run']
+                st.metric("🔥 Last Warmup", datetime.fromtimestamp(last_run['started_at']).strftime('%m-%d %H:%M')
+                          if last_run else "Never")
+            if last_run and last_run['finished_at']:
+                st.caption(f"Last warmup generated {last_run['generated']} sets, {last_run['failed']} failed"
+                           + (f", stopped early ({last_run['stopped']})" if last_run['stopped'] else ""))
+            try:
+                question_bank.parse_warmup_hours(AIConfig.QUESTION_BANK_WARMUP_HOURS)
+            except ValueError as e:
+                st.warning(f"⚠️ Warmup disabled: QUESTION_BANK_WARMUP_HOURS is invalid ({e})")
+
+        st.subheader("🎧 Speech-to-Text")
+        transcriber = get_transcription_queue()
+        if transcriber is None:
+            st.info("Local transcription disabled - install faster-whisper to transcribe recorded answers")
+        else:
+            metrics = transcriber.metrics()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("⚡ Throughput", f"{metrics['throughput']:.1f}x realtime")
+            with col2:
+                st.metric("📥 Queue", metrics['queue_depth'])
+            with col3:
+                st.metric("✅ Transcribed", metrics['completed'])
+            with col4:
+                st.metric("🎙️ Audio Processed", f"{metrics['audio_seconds'] / 60:.1f} min")
 
 # Sidebar info
-with st.sidebar:
-    st.markdown("### 🎯 HIRING SKILLED CANDIDATES")
-    st.markdown("**AI-Powered Interview Platform**")
-    
-    st.markdown("### 🤖 AI Features")
-    st.markdown("""
-    ✅ **Smart Question Generation**  
-    ✅ **Any Technical Skill Support**  
-    ✅ **Adaptive Difficulty Levels**  
-    ✅ **Live Recording Interface**  
-    ✅ **Advanced AI Evaluation**  
-    ✅ **Complete HR Dashboard**  
-    ✅ **Data Export Capabilities**  
-    """)
-    
-    st.markdown("### 👨‍💻 Developer")
-    st.markdown("""
-    **Akash Bauri**  
-    📧 akashbauri16021998@gmail.com  
-    📱 +91-8002778855  
-    
-    **🚀 Production Ready**  
-    **💡 Enterprise Grade**  
-    **🎯 Company Submission**  
-    """)
+def render_sidebar_info():
+    """Platform and developer details in the sidebar"""
+    with st.sidebar:
+        st.markdown("### 🎯 HIRING SKILLED CANDIDATES")
+        st.markdown("**AI-Powered Interview Platform**")
+        
+        st.markdown("### 🤖 AI Features")
+        st.markdown("""
+        ✅ **Smart Question Generation**  
+        ✅ **Any Technical Skill Support**  
+        ✅ **Adaptive Difficulty Levels**  
+        ✅ **Live Recording Interface**  
+        ✅ **Advanced AI Evaluation**  
+        ✅ **Complete HR Dashboard**  
+        ✅ **Data Export Capabilities**  
+        """)
+        
+        st.markdown("### 👨‍💻 Developer")
+        st.markdown("""
+        **Akash Bauri**  
+        📧 akashbauri16021998@gmail.com  
+        📱 +91-8002778855  
+        
+        **🚀 Production Ready**  
+        **💡 Enterprise Grade**  
+        **🎯 Company Submission**  
+        """)
 
 # Run the app
 if __name__ == "__main__":
@@ -0,0 +1,346 @@
+import argparse
+import functools
+import importlib.util
+import os
+import sqlite3
+import time
+
+# Columnar archive for old interview answers. Answers of finished
+# interviews older than a cutoff are moved out of interview_responses into
+# zstd-compressed Parquet files partitioned by month:
+#
+#   <archive_dir>/interview_responses/month=YYYY-MM/part-<first id>-<last id>.parquet
+#
+# Files are only ever added. The archive_partitions table lists every
+# committed file; it is written in the same transaction that deletes the
+# archived rows, so a crash can leave at most an unlisted file, which the
+# next run removes. Readers merge listed files with the live table.
+#
+# The same transaction records the archived answers' media refs in
+# archived_media_refs, so media compaction keeps their recordings, and drops
+# their rows from the similarity index (answer_lsh, answer_flags): flagged
+# pairs are reviewed side by side from the live table and a rebuild only
+# indexes live answers, so archived answers leave the index for good.
+#
+# Only one run works at a time: a run claims a row in archive_runs and keeps
+# its heartbeat fresh, and a claim whose heartbeat is older than
+# STALE_RUN_SECONDS belongs to a crashed run and may be taken over.
+
+RESPONSE_COLUMNS = [
+    "id", "candidate_id", "session_id", "skill", "skill_id", "question", "answer", "score",
+    "feedback", "response_time", "media_ref", "speaking_quality", "created_at"
+]
+INTEGER_COLUMNS = {"id", "candidate_id", "score"}
+FLOAT_COLUMNS = {"response_time"}
+
+PARTITION_DIR = "interview_responses"
+DEFAULT_BATCH_ROWS = 100000
+STALE_RUN_SECONDS = 600
+
+def archive_available():
+    """True when pyarrow is installed to write and read Parquet"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+def setup_archive_table(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS archive_partitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT UNIQUE NOT NULL,
+        month TEXT NOT NULL,
+        first_id INTEGER NOT NULL,
+        last_id INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        bytes INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS archive_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at REAL NOT NULL,
+        heartbeat_at REAL NOT NULL,
+        finished_at REAL,
+        rows INTEGER DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS archived_media_refs (
+        media_ref TEXT PRIMARY KEY
+    ) WITHOUT ROWID
+    ''')
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        (name, pa.int64() if name in INTEGER_COLUMNS else pa.float64() if name in FLOAT_COLUMNS else pa.string())
+        for name in RESPONSE_COLUMNS
+    ])
+
+def _remove_unlisted_files(conn, archive_dir):
+    """Delete part files a crashed run wrote but never committed"""
+    listed = {row[0] for row in conn.execute("SELECT path FROM archive_partitions").fetchall()}
+    root = os.path.join(archive_dir, PARTITION_DIR)
+    removed = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.relpath(os.path.join(directory, name), archive_dir)
+            if path not in listed:
+                os.remove(os.path.join(archive_dir, path))
+                removed += 1
+    return removed
+
+def claim_run(conn, write_lock=None):
+    """Start an archive run unless another one is still alive; returns the run id or None"""
+    from contextlib import nullcontext
+
+    with (write_lock or nullcontext)():
+        now = time.time()
+        running = conn.execute(
+            "SELECT COUNT(*) FROM archive_runs WHERE finished_at IS NULL AND heartbeat_at > ?",
+            (now - STALE_RUN_SECONDS,)
+        ).fetchone()[0]
+        if running:
+            return None
+        run_id = conn.execute(
+            "INSERT INTO archive_runs (started_at, heartbeat_at) VALUES (?, ?)", (now, now)
+        ).lastrowid
+        conn.commit()
+        return run_id
+
+def archive_responses(conn, archive_dir, older_than_days, batch_rows=DEFAULT_BATCH_ROWS, write_lock=None):
+    """Move answers of finished interviews older than the cutoff into monthly Parquet partitions"""
+    from contextlib import nullcontext
+
+    write_lock = write_lock or nullcontext
+    # The claim keeps a second run from deleting this run's not yet listed part files
+    run_id = claim_run(conn, write_lock)
+    if run_id is None:
+        raise RuntimeError("Another archive run is in progress")
+
+    result = {"rows": 0}
+    try:
+        result = _archive_run(conn, archive_dir, older_than_days, batch_rows, write_lock, run_id)
+        return result
+    finally:
+        with write_lock():
+            conn.execute("UPDATE archive_runs SET finished_at = ?, rows = ? WHERE id = ?",
+                         (time.time(), result["rows"], run_id))
+            conn.commit()
+
+def _archive_run(conn, archive_dir, older_than_days, batch_rows, write_lock, run_id):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    started = time.perf_counter()
+    schema = _schema()
+    cutoff = f"-{int(older_than_days)} days"
+    select_columns = ", ".join(RESPONSE_COLUMNS)
+    eligible = "candidate_id IS NOT NULL AND created_at < datetime('now', ?)"
+
+    removed = _remove_unlisted_files(conn, archive_dir)
+    similarity_tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('answer_lsh', 'answer_flags')"
+    ).fetchall()]
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+    media_index = RESPONSE_COLUMNS.index("media_ref")
+    months = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT strftime('%Y-%m', created_at) FROM interview_responses WHERE {eligible} ORDER BY 1",
+        (cutoff,)
+    ).fetchall()]
+
+    archived_rows, written_bytes, files = 0, 0, 0
+    for month in months:
+        month_dir = os.path.join(archive_dir, PARTITION_DIR, f"month={month}")
+        os.makedirs(month_dir, exist_ok=True)
+
+        while True:
+            rows = conn.execute(f'''
+            SELECT {select_columns} FROM interview_responses
+            WHERE {eligible} AND strftime('%Y-%m', created_at) = ?
+            ORDER BY id LIMIT ?
+            ''', (cutoff, month, batch_rows)).fetchall()
+            if not rows:
+                break
+
+            first_id, last_id = rows[0][0], rows[-1][0]
+            table = pa.Table.from_arrays(
+                [pa.array(column, type=schema.field(name).type) for name, column in zip(RESPONSE_COLUMNS, zip(*rows))],
+                schema=schema
+            )
+            relative_path = os.path.join(PARTITION_DIR, f"month={month}", f"part-{first_id:012d}-{last_id:012d}.parquet")
+            path = os.path.join(archive_dir, relative_path)
+            pq.write_table(table, path + ".tmp", compression="zstd")
+            os.replace(path + ".tmp", path)
+            size = os.path.getsize(path)
+
+            # Listing the file and deleting exactly the rows it holds commit together
+            with write_lock():
+                conn.execute('''
+                INSERT INTO archive_partitions (path, month, first_id, last_id, row_count, bytes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', (relative_path, month, first_id, last_id, len(rows), size))
+                conn.execute("DELETE FROM archive_batch")
+                conn.executemany("INSERT INTO archive_batch (id) VALUES (?)", ((row[0],) for row in rows))
+                conn.executemany("INSERT OR IGNORE INTO archived_media_refs (media_ref) VALUES (?)",
+                                 ((row[media_index],) for row in rows if row[media_index]))
+                conn.execute("DELETE FROM interview_responses WHERE id IN (SELECT id FROM archive_batch)")
+                if "answer_lsh" in similarity_tables:
+                    conn.execute("DELETE FROM answer_lsh WHERE response_id IN (SELECT id FROM archive_batch)")
+                if "answer_flags" in similarity_tables:
+                    conn.execute('''
+                    DELETE FROM answer_flags
+                    WHERE response_id IN (SELECT id FROM archive_batch) OR matched_response_id IN (SELECT id FROM archive_batch)
+                    ''')
+                conn.execute("UPDATE archive_runs SET heartbeat_at = ? WHERE id = ?", (time.time(), run_id))
+                conn.commit()
+
+            archived_rows += len(rows)
+            written_bytes += size
+            files += 1
+
+    return {
+        "rows": archived_rows, "files": files, "bytes": written_bytes,
+        "removed_unlisted": removed, "seconds": time.perf_counter() - started
+    }
+
+def archive_stats(conn):
+    """Rows, files and bytes held in the archive"""
+    row = conn.execute("SELECT COUNT(*), COALESCE(SUM(row_count), 0), COALESCE(SUM(bytes), 0) FROM archive_partitions").fetchone()
+    return {"files": row[0], "rows": row[1], "bytes": row[2]}
+
+def read_archived(conn, archive_dir, columns=None):
+    """Archived answers as a pyarrow Table (None when nothing is archived or pyarrow is missing)"""
+    if not archive_available():
+        return None
+    paths = [os.path.join(archive_dir, row[0]) for row in conn.execute(
+        "SELECT path FROM archive_partitions ORDER BY first_id"
+    ).fetchall()]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return None
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pa.concat_tables([pq.read_table(path, columns=columns) for path in paths])
+
+@functools.lru_cache(maxsize=4)
+def _archived_skill_totals(archive_dir, paths):
+    """skill_id -> (sorted candidate ids, answers, score sum) of the valid answers in `paths`"""
+    # Part files never change once listed, so the path tuple identifies the result
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.concat_tables([
+        pq.read_table(os.path.join(archive_dir, path), columns=["candidate_id", "skill_id", "score"]) for path in paths
+    ])
+    score = np.asarray(table.column("score").to_numpy(zero_copy_only=False), dtype=np.float64)
+    candidate_ids = table.column("candidate_id").to_numpy(zero_copy_only=False)
+    valid = (score > 0) & ~np.isnan(np.asarray(candidate_ids, dtype=np.float64))
+    skill_ids = np.array([s or "" for s in table.column("skill_id").to_pylist()], dtype=object)[valid]
+    candidate_ids = np.asarray(candidate_ids[valid], dtype=np.int64)
+    score = score[valid]
+
+    totals = {}
+    unique_skills, skill_index = np.unique(skill_ids.astype(str), return_inverse=True)
+    for index, skill_id in enumerate(unique_skills):
+        in_skill = skill_index == index
+        totals[skill_id] = (np.unique(candidate_ids[in_skill]), int(in_skill.sum()), float(score[in_skill].sum()))
+    return totals
+
+def skill_summary(conn, archive_dir):
+    """(skill_id, candidates, answers, average score) over valid answers of finished interviews, archived ones included"""
+    import numpy as np
+
+    totals = {skill_id: [candidates, answers, score_sum] for skill_id, candidates, answers, score_sum in conn.execute('''
+    SELECT COALESCE(skill_id, ''), COUNT(DISTINCT candidate_id), COUNT(*), TOTAL(score) FROM interview_responses
+    WHERE candidate_id IS NOT NULL AND score > 0
+    GROUP BY 1
+    ''').fetchall()}
+
+    paths = tuple(row[0] for row in conn.execute("SELECT path FROM archive_partitions ORDER BY first_id").fetchall()
+                  if os.path.exists(os.path.join(archive_dir, row[0])))
+    if paths and archive_available():
+        archived = _archived_skill_totals(archive_dir, paths)
+
+        # A candidate with both live and archived answers for a skill is counted once
+        max_archived = max((int(ids[-1]) for ids, _, _ in archived.values() if len(ids)), default=None)
+        if max_archived is not None:
+            for skill_id, candidate_id in conn.execute('''
+            SELECT DISTINCT COALESCE(skill_id, ''), candidate_id FROM interview_responses
+            WHERE candidate_id <= ? AND score > 0
+            ''', (max_archived,)).fetchall():
+                ids = archived.get(skill_id, (np.empty(0, dtype=np.int64),))[0]
+                position = np.searchsorted(ids, candidate_id)
+                if position < len(ids) and ids[position] == candidate_id:
+                    totals[skill_id][0] -= 1
+
+        for skill_id, (ids, answers, score_sum) in archived.items():
+            entry = totals.setdefault(skill_id, [0, 0, 0.0])
+            entry[0] += len(ids)
+            entry[1] += answers
+            entry[2] += score_sum
+
+    summary = [(skill_id, candidates, answers, score_sum / answers)
+               for skill_id, (candidates, answers, score_sum) in totals.items() if answers]
+    return sorted(summary, key=lambda row: (-row[1], row[0]))
+
+def read_responses(conn, archive_dir, columns=None):
+    """Live and archived answers together as one pandas DataFrame"""
+    import pandas as pd
+
+    columns = columns or RESPONSE_COLUMNS
+    live = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM interview_responses", conn)
+    archived = read_archived(conn, archive_dir, columns)
+    if archived is None or archived.num_rows == 0:
+        return live
+    return pd.concat([live, archived.to_pandas()], ignore_index=True)
+
+def read_archived_columns(conn, archive_dir, columns):
+    """Selected archived columns as numpy arrays (None when nothing is archived)"""
+    # Callers recompute totals from these, so a listed file that cannot be read is an error
+    listed = [row[0] for row in conn.execute("SELECT path FROM archive_partitions").fetchall()]
+    if listed and not archive_available():
+        raise RuntimeError(f"{len(listed)} archived files need pyarrow to read: pip install pyarrow")
+    missing = [path for path in listed if not os.path.exists(os.path.join(archive_dir, path))]
+    if missing:
+        raise RuntimeError(f"{len(missing)} archived files are missing from {archive_dir}/, e.g. {missing[0]}")
+
+    table = read_archived(conn, archive_dir, columns)
+    if table is None or table.num_rows == 0:
+        return None
+    return {name: table.column(name).to_numpy(zero_copy_only=False) for name in columns}
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old interview answers into the Parquet archive")
+    parser.add_argument("--database", default=os.getenv("DATABASE_PATH", "hiring_skilled_candidates.db"))
+    parser.add_argument("--archive-dir", default=os.getenv("ARCHIVE_DIR", "archive"))
+    parser.add_argument("--older-than-days", type=int, default=int(os.getenv("ARCHIVE_AFTER_DAYS", "365")))
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument("--vacuum", action="store_true", help="Rebuild the database file afterwards to return freed space")
+    args = parser.parse_args()
+
+    if not archive_available():
+        raise SystemExit("The archive needs pyarrow: pip install pyarrow")
+
+    conn = sqlite3.connect(args.database)
+    setup_archive_table(conn.cursor())
+    conn.commit()
+
+    try:
+        result = archive_responses(conn, args.archive_dir, args.older_than_days, args.batch_rows)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    print(f"Archived {result['rows']} answers into {result['files']} files "
+          f"({result['bytes'] / 1e6:.1f} MB) in {result['seconds']:.1f}s")
+
+    if args.vacuum:
+        size = os.path.getsize(args.database)
+        conn.execute("VACUUM")
+        print(f"Database {size / 1e6:.1f} MB -> {os.path.getsize(args.database) / 1e6:.1f} MB")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+
+# Interview replay benchmark: re-runs the scoring pipeline (question
+# generation, answer evaluation, final assessment) over interviews stored
+# in the database with LLM traffic served from a cassette, and prints a
+# digest of every result so two runs can be compared byte for byte.
+#
+#   python benchmark_replay.py --mode record      # live API, writes the cassette
+#   python benchmark_replay.py                    # offline replay
+#   python benchmark_replay.py --latency-scale 1  # replay with recorded API latency
+#   python benchmark_replay.py --expect-digest <sha256>
+
+def load_interviews(database, limit):
+    """Stored interviews with their answers, oldest first"""
+    conn = sqlite3.connect(database)
+    candidates = conn.execute('''
+    SELECT id, experience, final_score, result_status FROM candidates ORDER BY id LIMIT ?
+    ''', (limit,)).fetchall()
+
+    answers = defaultdict(list)
+    ids = [row[0] for row in candidates]
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        for candidate_id, skill, skill_id, question, answer in conn.execute(f'''
+        SELECT candidate_id, skill, skill_id, question, answer FROM interview_responses
+        WHERE candidate_id IN ({",".join("?" * len(batch))}) ORDER BY id
+        ''', batch):
+            answers[candidate_id].append((skill, skill_id, question, answer))
+    conn.close()
+
+    return [{
+        "id": candidate_id, "experience": experience, "final_score": final_score,
+        "result_status": result_status, "answers": answers[candidate_id]
+    } for candidate_id, experience, final_score, result_status in candidates]
+
+def replay_interviews(app, interviews, progress=None):
+    """Score every stored interview again; returns the per-candidate results and timings"""
+    import llm_scheduler
+    import question_bank
+
+    results, question_sets, timings = [], {}, {"questions": 0.0, "evaluation": 0.0}
+    for done, interview in enumerate(interviews, 1):
+        level = question_bank.experience_level(interview["experience"])
+
+        started = time.perf_counter()
+        for skill in sorted({skill for skill, _, _, _ in interview["answers"]}):
+            if (skill, level) not in question_sets:
+                question_sets[(skill, level)] = app.generate_ai_questions(skill, level, 5, llm_scheduler.PRIORITY_BATCH)
+        timings["questions"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        responses = []
+        for skill, skill_id, question, answer in interview["answers"]:
+            if answer == "SKIPPED":
+                score, feedback, speaking_quality = 0, ["Skipped"], "Beginner"
+            else:
+                score, feedback, speaking_quality = app.evaluate_answer_with_ai(
+                    question, skill, level, answer,
+                    priority=llm_scheduler.PRIORITY_BATCH, session_id=f"replay-{interview['id']}"
+                )
+            # skill_id selects the rubric weight of the answer in the final score
+            responses.append({"skill": skill, "skill_id": skill_id, "question": question, "answer": answer,
+                              "score": score, "feedback": feedback, "speaking_quality": speaking_quality})
+        final_score, speaking_quality, _ = app.compute_final_assessment(responses)
+        timings["evaluation"] += time.perf_counter() - started
+
+        results.append({
+            "candidate_id": interview["id"],
+            "scores": [response["score"] for response in responses],
+            "feedback": [response["feedback"] for response in responses],
+            "speaking": [response["speaking_quality"] for response in responses],
+            "final_score": final_score,
+            "speaking_quality": speaking_quality,
+            "result_status": app.determine_result(final_score)[0]
+        })
+        if progress:
+            progress(done)
+
+    questions = [{"skill": skill, "level": level, "questions": question_sets[(skill, level)]}
+                 for skill, level in sorted(question_sets)]
+    return results, questions, timings
+
+def digest(results, questions):
+    """sha256 over every replayed result, stable across runs and machines"""
+    canonical = json.dumps({"results": results, "questions": questions}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored interviews through the scoring pipeline")
+    parser.add_argument("--database", default=os.getenv("DATABASE_PATH", "hiring_skilled_candidates.db"))
+    parser.add_argument("--cassette", default=os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl.gz"))
+    parser.add_argument("--mode", choices=["replay", "record"], default="replay")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Sleep this multiple of the recorded API latency per replayed call")
+    parser.add_argument("--limit", type=int, default=1000, help="Interviews to replay")
+    parser.add_argument("--output", help="Write the replayed results as JSON")
+    parser.add_argument("--expect-digest", help="Fail unless the results hash to this digest")
+    args = parser.parse_args()
+
+    # AIConfig reads these when app is imported
+    os.environ["DATABASE_PATH"] = args.database
+    os.environ["LLM_CASSETTE_MODE"] = args.mode
+    os.environ["LLM_CASSETTE_PATH"] = args.cassette
+    os.environ["LLM_CASSETTE_LATENCY_SCALE"] = str(args.latency_scale)
+    import app
+
+    if args.mode == "record" and not app.AIConfig.get_perplexity_api_key():
+        raise SystemExit("Recording needs PERPLEXITY_API_KEY")
+    if args.mode == "replay" and not os.path.exists(args.cassette):
+        raise SystemExit(f"No cassette at {args.cassette}; record one with --mode record")
+
+    interviews = load_interviews(args.database, args.limit)
+    answers = sum(len(interview["answers"]) for interview in interviews)
+
+    started = time.perf_counter()
+    results, questions, timings = replay_interviews(app, interviews)
+    elapsed = time.perf_counter() - started
+    cassette = app.get_llm_cassette()
+    cassette.flush()
+    metrics = cassette.metrics()
+
+    changed = sum(1 for interview, result in zip(interviews, results)
+                  if interview["final_score"] != result["final_score"]
+                  or interview["result_status"] != result["result_status"])
+    result_digest = digest(results, questions)
+
+    print(f"{args.mode.title()}: {len(interviews)} interviews, {answers} answers, "
+          f"{len(questions)} question sets in {elapsed:.2f}s ({answers / elapsed if elapsed else 0:.0f} answers/s)")
+    print(f"  question generation {timings['questions']:.2f}s, evaluation {timings['evaluation']:.2f}s")
+    print(f"  cassette {metrics['path']}: {metrics['hits']} replayed, {metrics['misses']} missing, "
+          f"{metrics['recorded']} recorded")
+    print(f"  final score or result differs from the stored one for {changed} interviews")
+    print(f"  digest {result_digest}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"digest": result_digest, "results": results, "questions": questions}, f, indent=1)
+
+    if args.mode == "replay" and metrics["misses"]:
+        print("Replay incomplete: some requests are not in the cassette (re-record it)")
+        sys.exit(1)
+    if args.expect_digest and args.expect_digest != result_digest:
+        print(f"Digest mismatch: expected {args.expect_digest}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
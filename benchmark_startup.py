@@ -0,0 +1,104 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup benchmark: cold import time of app.py in fresh interpreters, the
+# slowest modules it pulls in, and the per-rerun cost of the landing page.
+#
+#   python benchmark_startup.py [--runs 5] [--reruns 20] [--max-import-ms N] [--max-rerun-ms N]
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+import app
+elapsed = (time.perf_counter() - started) * 1000
+heavy = [name for name in ("pandas", "numpy", "requests", "xlsxwriter", "openpyxl") if name in sys.modules]
+print(f"{elapsed:.1f}|{','.join(heavy)}")
+"""
+
+def run_python(args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [APP_DIR, env.get("PYTHONPATH")]))
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, cwd=APP_DIR, env=env)
+
+def cold_import(runs):
+    """Import time of app.py (ms) in fresh interpreters, plus heavy modules it loaded"""
+    times, heavy = [], ""
+    for _ in range(runs):
+        result = run_python(["-c", IMPORT_SNIPPET])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        elapsed, heavy = result.stdout.strip().splitlines()[-1].split("|")
+        times.append(float(elapsed))
+    return times, heavy.split(",") if heavy else []
+
+def slowest_imports(limit):
+    """Direct imports of app.py ranked by cumulative import time (-X importtime)"""
+    result = run_python(["-X", "importtime", "-c", "import app"])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Two spaces of indentation marks a module imported by app itself
+        if name.startswith("   ") and not name.startswith("    ") and cumulative.strip().isdigit():
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:limit]
+
+def rerun_times(reruns):
+    """Wall time (ms) of the first run and of reruns of the landing page"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    started = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - started) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return first, times
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.py cold start and rerun overhead")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters for the import benchmark")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns of the landing page")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Fail if the median import is slower")
+    parser.add_argument("--max-rerun-ms", type=float, default=None, help="Fail if the median rerun is slower")
+    args = parser.parse_args()
+
+    times, heavy = cold_import(args.runs)
+    import_ms = statistics.median(times)
+    print(f"Cold import of app.py: median {import_ms:.0f} ms, min {min(times):.0f} ms ({args.runs} runs)")
+    print(f"Heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+
+    print("Slowest direct imports:")
+    for cumulative_ms, name in slowest_imports(8):
+        print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+    first_ms, reruns = rerun_times(args.reruns)
+    rerun_ms = statistics.median(reruns)
+    print(f"Landing page: first run {first_ms:.0f} ms, rerun median {rerun_ms:.1f} ms, "
+          f"p95 {sorted(reruns)[int(0.95 * (len(reruns) - 1))]:.1f} ms ({args.reruns} reruns)")
+
+    failed = []
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failed.append(f"import {import_ms:.0f} ms > {args.max_import_ms:.0f} ms")
+    if args.max_rerun_ms is not None and rerun_ms > args.max_rerun_ms:
+        failed.append(f"rerun {rerun_ms:.1f} ms > {args.max_rerun_ms:.1f} ms")
+    if failed:
+        print("Over budget: " + "; ".join(failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+# Record/replay of LLM traffic. In record mode every successful API reply is
+# appended to a gzip-compressed JSON-lines cassette as
+#
+#   {"k": <request key>, "c": <reply text>, "ms": <service latency>}
+#
+# where the key is a hash of the full request payload (model, messages and
+# sampling parameters). In replay mode replies are served from the cassette
+# without touching the network, optionally sleeping for the recorded
+# latency. A request made several times replays its recorded replies in
+# order (the last one repeats), so an identical run reproduces identical
+# replies.
+#
+# Lines are written in batches, each batch a complete gzip member appended
+# with a single write, so several recording processes can share a file and
+# a crash loses at most the unwritten batch.
+
+MODES = ("off", "record", "replay")
+FLUSH_EVERY = 20
+
+def request_key(payload):
+    """Stable key of a request payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+def read_entries(path):
+    """Entries of a cassette in recorded order; a tail cut off by a crash is ignored"""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # Decode member by member so a truncated last member keeps the ones before it
+    while data:
+        member = zlib.decompressobj(wbits=31)
+        try:
+            text = member.decompress(data)
+        except zlib.error:
+            break
+        if not member.eof:
+            break
+        entries.extend(json.loads(line) for line in text.decode("utf-8").splitlines() if line)
+        data = member.unused_data
+    return entries
+
+class Cassette:
+    """On-disk store of LLM replies keyed by request"""
+
+    def __init__(self, path, mode, latency_scale=0.0, sleep=time.sleep):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.sleep = sleep
+        self.lock = threading.Lock()
+
+        self.replies = defaultdict(list)
+        for entry in read_entries(path):
+            self.replies[entry["k"]].append(entry)
+        self.positions = defaultdict(int)
+        self.pending = []
+        if mode == "record":
+            atexit.register(self.flush)
+
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def record(self, payload, reply, latency):
+        """Append one reply and its service latency (seconds)"""
+        entry = {"k": request_key(payload), "c": reply, "ms": round(latency * 1000, 1)}
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.pending.append(line)
+            self.replies[entry["k"]].append(entry)
+            self.recorded += 1
+            if len(self.pending) >= FLUSH_EVERY:
+                self._write_pending()
+
+    def _write_pending(self):
+        if not self.pending:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        member = gzip.compress("".join(self.pending).encode("utf-8"))
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, member)
+        finally:
+            os.close(fd)
+        self.pending = []
+
+    def flush(self):
+        """Write recorded replies that are still buffered"""
+        with self.lock:
+            self._write_pending()
+
+    def replay(self, payload):
+        """Recorded reply for a request (None when the cassette has none)"""
+        key = request_key(payload)
+        with self.lock:
+            replies = self.replies.get(key)
+            if not replies:
+                self.misses += 1
+                return None
+            entry = replies[min(self.positions[key], len(replies) - 1)]
+            self.positions[key] += 1
+            self.hits += 1
+
+        if self.latency_scale:
+            self.sleep(entry["ms"] / 1000 * self.latency_scale)
+        return entry["c"]
+
+    def rewind(self):
+        """Start replaying every request from its first recorded reply again"""
+        with self.lock:
+            self.positions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "mode": self.mode,
+                "path": self.path,
+                "requests": len(self.replies),
+                "replies": sum(len(replies) for replies in self.replies.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "recorded": self.recorded
+            }
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+def get_cassette(path, mode, latency_scale=0.0):
+    """The cassette shared by every session and thread in this process"""
+    with _cassettes_lock:
+        key = (os.path.abspath(path), mode)
+        if key not in _cassettes:
+            _cassettes[key] = Cassette(path, mode, latency_scale)
+        return _cassettes[key]
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Process-wide scheduler for LLM API calls: a token bucket keeps the
+# request rate under the provider quota, a priority queue serves
+# interactive evaluations before question generation and batch jobs, and
+# sessions within a priority are served round-robin so one busy session
+# cannot starve the others.
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 1
+PRIORITY_BATCH = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_PREFETCH: "prefetch",
+    PRIORITY_BATCH: "batch"
+}
+
+WAIT_SAMPLES = 500
+
+class LLMScheduler:
+    """Token-bucket rate limiter with priority and per-session fair queuing"""
+
+    def __init__(self, rate_per_second, burst, max_concurrency):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+
+        self.cond = threading.Condition()
+        self.queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-call")
+
+        self.wait_times = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITY_NAMES}
+        self.completed = 0
+        self.throttled = 0
+
+        threading.Thread(target=self._dispatch, name="llm-scheduler", daemon=True).start()
+
+    def submit(self, fn, priority=PRIORITY_INTERACTIVE, session_id="default"):
+        """Queue fn for execution under the rate limit; returns a Future"""
+        future = Future()
+        request = {"fn": fn, "future": future, "priority": priority, "enqueued_at": time.monotonic()}
+        with self.cond:
+            self.queues[priority].setdefault(session_id, deque()).append(request)
+            self.cond.notify_all()
+        return future
+
+    def throttle(self, seconds):
+        """Back off after a rate-limit response: pause dispatch and empty the bucket"""
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.throttled += 1
+            self.cond.notify_all()
+
+    def _has_pending(self):
+        return any(self.queues[priority] for priority in PRIORITY_NAMES)
+
+    def _drop_cancelled(self):
+        # Cancelled requests never run, so they must not count as queued
+        for sessions in self.queues.values():
+            for session_id in list(sessions):
+                requests = deque(r for r in sessions[session_id] if not r["future"].cancelled())
+                if requests:
+                    sessions[session_id] = requests
+                else:
+                    del sessions[session_id]
+
+    def _pop_next(self):
+        """Claim the next live request, skipping cancelled ones; None if only cancelled were left"""
+        for priority in sorted(self.queues):
+            sessions = self.queues[priority]
+            while sessions:
+                # Round-robin: serve the first waiting session, then move it to the back
+                session_id, requests = next(iter(sessions.items()))
+                request = requests.popleft()
+                if requests:
+                    sessions.move_to_end(session_id)
+                else:
+                    del sessions[session_id]
+                # Marks the future running so it can no longer be cancelled once a token is spent
+                if request["future"].set_running_or_notify_cancel():
+                    return request
+        return None
+
+    def _dispatch(self):
+        while True:
+            self.slots.acquire()
+            with self.cond:
+                while True:
+                    if not self._has_pending():
+                        self.cond.wait()
+                        continue
+
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        self.cond.wait(self.paused_until - now)
+                        continue
+
+                    self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                    self.last_refill = now
+                    if self.tokens < 1:
+                        self.cond.wait((1 - self.tokens) / self.rate)
+                        continue
+
+                    request = self._pop_next()
+                    if request is None:
+                        continue
+                    self.tokens -= 1
+                    self.wait_times[request["priority"]].append(now - request["enqueued_at"])
+                    break
+
+            self.executor.submit(self._run, request)
+
+    def _run(self, request):
+        try:
+            try:
+                request["future"].set_result(request["fn"]())
+            except Exception as e:
+                request["future"].set_exception(e)
+        finally:
+            with self.cond:
+                self.completed += 1
+            self.slots.release()
+
+    def metrics(self):
+        """Queue depth and wait times per priority"""
+        with self.cond:
+            self._drop_cancelled()
+            result = {
+                "completed": self.completed,
+                "throttled": self.throttled,
+                "rate_per_second": self.rate,
+                "queues": {}
+            }
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self.wait_times[priority])
+                result["queues"][name] = {
+                    "depth": sum(len(requests) for requests in self.queues[priority].values()),
+                    "sessions": len(self.queues[priority]),
+                    "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                    "p95_wait": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+                }
+            return result
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler(rate_per_second, burst, max_concurrency):
+    """The scheduler shared by every session, thread and batch job in this process"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(rate_per_second, burst, max_concurrency)
+        return _scheduler
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+
+import skills
+
+# Persistent question bank: generated question sets keyed by (canonical
+# skill id, experience level, question count) and shared by every worker
+# process. Registration reads the bank first and counts hits and misses per
+# day; a warmup job fills the bank ahead of time for the (skill, level)
+# pairs candidates ask for most, spending at most a fixed number of LLM
+# calls per run and only while the LLM scheduler has nothing else queued.
+
+DEFAULT_TOP_N = 30
+DEFAULT_MAX_AGE_DAYS = 7
+DEFAULT_LOOKBACK_DAYS = 90
+MAX_SKILLS_PER_CANDIDATE = 5
+
+def setup_question_bank_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS question_bank (
+        skill_id TEXT NOT NULL,
+        experience_level TEXT NOT NULL,
+        num_questions INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        questions TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (skill_id, experience_level, num_questions)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS question_bank_lookups (
+        day TEXT PRIMARY KEY,
+        hits INTEGER NOT NULL DEFAULT 0,
+        misses INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS question_bank_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        generated INTEGER DEFAULT 0,
+        failed INTEGER DEFAULT 0,
+        stopped TEXT
+    )
+    ''')
+
+def experience_level(experience):
+    """"INTERMEDIATE (2-5 years)" -> "INTERMEDIATE", as registration passes it to the generator"""
+    return (experience or "").split('(')[0].strip()
+
+def lookup(conn, skill_id, level, num_questions, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """Banked questions for a skill and level, or None when missing or older than max_age_days"""
+    row = conn.execute('''
+    SELECT questions FROM question_bank
+    WHERE skill_id = ? AND experience_level = ? AND num_questions = ? AND created_at >= datetime('now', ?)
+    ''', (skill_id, level, num_questions, f"-{int(max_age_days)} days")).fetchone()
+    return json.loads(row[0]) if row else None
+
+def store(conn, skill_id, skill, level, questions):
+    """Bank a generated question set, replacing an older one; the caller commits"""
+    conn.execute('''
+    INSERT OR REPLACE INTO question_bank (skill_id, experience_level, num_questions, skill, questions, created_at)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (skill_id, level, len(questions), skill, json.dumps(questions)))
+
+def record_lookup(conn, hit):
+    """Count a registration lookup against today's hits or misses; the caller commits"""
+    column = "hits" if hit else "misses"
+    conn.execute(f'''
+    INSERT INTO question_bank_lookups (day, {column}) VALUES (date('now'), 1)
+    ON CONFLICT(day) DO UPDATE SET {column} = {column} + 1
+    ''')
+
+def hit_rate(conn, days=7):
+    """Hits, misses and hit rate of registration lookups over the last days"""
+    hits, misses = conn.execute('''
+    SELECT COALESCE(SUM(hits), 0), COALESCE(SUM(misses), 0) FROM question_bank_lookups
+    WHERE day > date('now', ?)
+    ''', (f"-{int(days)} days",)).fetchone()
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "rate": hits / total if total else None}
+
+def bank_stats(conn):
+    """Number of banked question sets and the latest warmup run"""
+    entries = conn.execute("SELECT COUNT(*) FROM question_bank").fetchone()[0]
+    run = conn.execute('''
+    SELECT started_at, finished_at, generated, failed, stopped FROM question_bank_runs ORDER BY id DESC LIMIT 1
+    ''').fetchone()
+    last_run = dict(zip(["started_at", "finished_at", "generated", "failed", "stopped"], run)) if run else None
+    return {"entries": entries, "last_run": last_run}
+
+def popular_skill_levels(conn, top_n=DEFAULT_TOP_N, lookback_days=DEFAULT_LOOKBACK_DAYS):
+    """Most requested (skill_id, display name, level) triples among recent candidates"""
+    # Group identical skills fields in SQL so each distinct string is parsed once
+    rows = conn.execute('''
+    SELECT skills, experience, COUNT(*) FROM candidates
+    WHERE created_at >= datetime('now', ?)
+    GROUP BY skills, experience
+    ''', (f"-{int(lookback_days)} days",)).fetchall()
+
+    counts, names = Counter(), {}
+    for skills_text, experience, count in rows:
+        level = experience_level(experience)
+        for skill_id, skill in skills.parse_skills(skills_text, limit=MAX_SKILLS_PER_CANDIDATE):
+            counts[(skill_id, level)] += count
+            names.setdefault(skill_id, skill)
+    return [(skill_id, names[skill_id], level) for (skill_id, level), _ in counts.most_common(top_n)]
+
+def parse_warmup_hours(hours):
+    """(start, end) of a "start-end" local hour window such as "1-6" or "22-5"; None for an empty setting"""
+    if not hours or not hours.strip():
+        return None
+    try:
+        start, end = (int(part) for part in hours.split("-"))
+    except ValueError:
+        raise ValueError(f"Warmup hours must look like \"1-6\", got {hours!r}")
+    if not (0 <= start <= 23 and 0 <= end <= 24):
+        raise ValueError(f"Warmup hours must be between 0 and 24, got {hours!r}")
+    return start, end
+
+def in_warmup_hours(window, now=None):
+    """True when the local hour falls in a window from parse_warmup_hours; None means always"""
+    if window is None:
+        return True
+    start, end = window
+    hour = (now or datetime.now()).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+def claim_run(conn, min_gap_seconds, write_lock=None):
+    """Start a warmup run unless another worker started one within min_gap_seconds; returns the run id"""
+    with (write_lock or nullcontext)():
+        last = conn.execute("SELECT MAX(started_at) FROM question_bank_runs").fetchone()[0]
+        now = time.time()
+        if last is not None and now - last < min_gap_seconds:
+            return None
+        run_id = conn.execute("INSERT INTO question_bank_runs (started_at) VALUES (?)", (now,)).lastrowid
+        conn.commit()
+        return run_id
+
+def warm(conn, generate, top_n=DEFAULT_TOP_N, max_calls=20, call_interval=5.0, num_questions=5,
+         max_age_days=DEFAULT_MAX_AGE_DAYS, lookback_days=DEFAULT_LOOKBACK_DAYS,
+         write_lock=None, is_idle=None, run_id=None, sleep=time.sleep):
+    """Generate missing or stale question sets for the most popular skills within the call budget"""
+    write_lock = write_lock or nullcontext
+    popular = popular_skill_levels(conn, top_n, lookback_days)
+    missing = [(skill_id, skill, level) for skill_id, skill, level in popular
+               if lookup(conn, skill_id, level, num_questions, max_age_days) is None]
+
+    generated, failed, stopped = 0, 0, None
+    for calls, (skill_id, skill, level) in enumerate(missing):
+        if calls >= max_calls:
+            stopped = "budget"
+            break
+        if is_idle is not None and not is_idle():
+            stopped = "busy"
+            break
+        if calls and call_interval:
+            sleep(call_interval)
+
+        # A short reply would bank filler questions for every candidate until it expires
+        questions = generate(skill, level, num_questions)
+        if not questions or len(questions) < num_questions:
+            failed += 1
+            continue
+        with write_lock():
+            store(conn, skill_id, skill, level, questions)
+            conn.commit()
+        generated += 1
+
+    if run_id is not None:
+        with write_lock():
+            conn.execute('''
+            UPDATE question_bank_runs SET finished_at = ?, generated = ?, failed = ?, stopped = ? WHERE id = ?
+            ''', (time.time(), generated, failed, stopped, run_id))
+            conn.commit()
+    return {"popular": len(popular), "missing": len(missing), "generated": generated,
+            "failed": failed, "stopped": stopped}
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate questions for the most popular skills")
+    parser.add_argument("--database", default=os.getenv("DATABASE_PATH", "hiring_skilled_candidates.db"))
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="Popular (skill, level) pairs to keep warm")
+    parser.add_argument("--max-calls", type=int, default=20, help="LLM calls allowed in this run")
+    parser.add_argument("--call-interval", type=float, default=5.0, help="Seconds between LLM calls")
+    parser.add_argument("--max-age-days", type=int, default=DEFAULT_MAX_AGE_DAYS)
+    args = parser.parse_args()
+
+    # Generation goes through the app's LLM client and scheduler
+    import app
+    import llm_scheduler
+
+    if not app.AIConfig.get_perplexity_api_key():
+        raise SystemExit("PERPLEXITY_API_KEY is not set; nothing to warm up")
+
+    conn = sqlite3.connect(args.database)
+    setup_question_bank_tables(conn.cursor())
+    conn.commit()
+
+    result = warm(
+        conn,
+        lambda skill, level, n: app.generate_ai_questions(skill, level, n, llm_scheduler.PRIORITY_BATCH, fallback=False),
+        top_n=args.top, max_calls=args.max_calls, call_interval=args.call_interval, max_age_days=args.max_age_days,
+        run_id=claim_run(conn, 0)
+    )
+    print(f"{result['popular']} popular pairs, {result['missing']} missing or stale, "
+          f"{result['generated']} generated, {result['failed']} failed"
+          + (f" (stopped: {result['stopped']})" if result['stopped'] else ""))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
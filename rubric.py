@@ -0,0 +1,386 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import archive
+import skills
+
+# Versioned scoring rubric. Per-response scores stored in
+# interview_responses.score are the raw scores; a rubric turns them into a
+# candidate's final_score, speaking_quality and result_status. When the
+# rubric changes, rescore_history() recomputes those three columns for every
+# stored candidate in one aggregated SQL pass plus vectorized band lookups.
+#
+# The final score is the weighted average of each skill's mean answer score,
+# so a skill counts the same however many of its questions were answered
+# (adaptive interviews skip the rest of a skill once its band is settled).
+#
+# A rubric file is JSON with any of the DEFAULT_RUBRIC keys, e.g.
+#   {"result_bands": [[85, "HIRED - OUTSTANDING"], ...], "skill_weights": {"python": 2}}
+
+SPEAKING_LEVELS = {"Beginner": 1, "Intermediate": 2, "Advanced": 3, "Fluent": 4, "Proficiency": 5}
+DEFAULT_SPEAKING_VALUE = SPEAKING_LEVELS["Intermediate"]
+
+# Part of every rubric fingerprint, so a change in how answers combine marks
+# stored scores as stale just like a changed rubric file does
+SCORING_METHOD = "skill-mean"
+
+DEFAULT_RUBRIC = {
+    # (minimum final score, result status), highest first
+    "result_bands": [
+        [80, "HIRED - OUTSTANDING"],
+        [70, "HIRED - EXCELLENT"],
+        [60, "HIRED - GOOD"],
+        [45, "UNDER REVIEW"],
+        [0, "NOT SELECTED"]
+    ],
+    # Offline evaluator: (minimum answer score, speaking quality, feedback)
+    "answer_levels": [
+        [80, "Proficiency", "Excellent technical response"],
+        [65, "Fluent", "Good technical understanding"],
+        [0, "Intermediate", "Basic understanding shown"]
+    ],
+    # (minimum average speaking level 1-5, overall speaking quality)
+    "speaking_bands": [
+        [4.5, "Proficiency"],
+        [3.5, "Fluent"],
+        [2.5, "Advanced"],
+        [0, "Intermediate"]
+    ],
+    # Canonical skill id -> weight in the final score
+    "skill_weights": {},
+    "default_weight": 1.0
+}
+
+class Rubric:
+    """Score thresholds and per-skill weights of one rubric definition"""
+
+    def __init__(self, definition=None):
+        if definition is not None and not isinstance(definition, dict):
+            raise ValueError("Rubric must be a JSON object")
+        definition = {**DEFAULT_RUBRIC, **(definition or {})}
+        for key, width in (("result_bands", 2), ("answer_levels", 3), ("speaking_bands", 2)):
+            bands = definition[key]
+            if not isinstance(bands, list) or any(
+                not isinstance(b, list) or len(b) != width or isinstance(b[0], bool) or not isinstance(b[0], (int, float))
+                or not all(isinstance(label, str) for label in b[1:]) for b in bands
+            ):
+                raise ValueError(f"Rubric '{key}' must be a list of [minimum, {', '.join(['label'] * (width - 1))}] entries")
+            if not bands or [b[0] for b in bands] != sorted((b[0] for b in bands), reverse=True) or bands[-1][0] != 0:
+                raise ValueError(f"Rubric '{key}' must be ordered from highest to lowest and end at 0")
+        unknown = {b[1] for b in definition["answer_levels"]} - set(SPEAKING_LEVELS)
+        if unknown:
+            raise ValueError(f"Rubric 'answer_levels' uses unknown speaking levels: {', '.join(sorted(unknown))}")
+        if not isinstance(definition["skill_weights"], dict):
+            raise ValueError("Rubric 'skill_weights' must map skill ids to numbers")
+
+        self.definition = definition
+        self.fingerprint = hashlib.sha256(
+            json.dumps({**definition, "scoring_method": SCORING_METHOD}, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        try:
+            self.skill_weights = {k: float(v) for k, v in definition["skill_weights"].items()}
+            self.default_weight = float(definition["default_weight"])
+        except (TypeError, ValueError):
+            raise ValueError("Rubric weights must be numbers")
+        if any(w < 0 for w in self.skill_weights.values()) or self.default_weight < 0:
+            raise ValueError("Rubric weights must not be negative")
+
+    def weight(self, skill_id):
+        return self.skill_weights.get(skill_id, self.default_weight)
+
+    def result_status(self, final_score):
+        for min_score, status in self.definition["result_bands"]:
+            if final_score >= min_score:
+                return status
+        return self.definition["result_bands"][-1][1]
+
+    def answer_level(self, score):
+        """(speaking quality, feedback) the offline evaluator gives an answer score"""
+        for min_score, speaking_quality, feedback in self.definition["answer_levels"]:
+            if score >= min_score:
+                return speaking_quality, feedback
+        return tuple(self.definition["answer_levels"][-1][1:])
+
+    def speaking_level(self, average):
+        for min_level, speaking_quality in self.definition["speaking_bands"]:
+            if average >= min_level:
+                return speaking_quality
+        return self.definition["speaking_bands"][-1][1]
+
+    def assess(self, responses):
+        """Final score, overall speaking quality and valid responses of one candidate"""
+        valid_responses = [r for r in responses if r['score'] > 0]
+        if not valid_responses:
+            return 0, "Beginner", valid_responses
+
+        skill_scores = defaultdict(list)
+        for r in valid_responses:
+            skill_scores[r.get('skill_id') or skills.canonical_skill(r['skill'])[0]].append(r['score'])
+        weights = {skill_id: self.weight(skill_id) for skill_id in skill_scores}
+
+        weight_sum = sum(weights.values())
+        if weight_sum > 0:
+            average = sum(weights[s] * sum(scores) / len(scores) for s, scores in skill_scores.items()) / weight_sum
+            final_score = final_score_of(average)
+        else:
+            final_score = 0
+
+        # Only known levels are averaged, as in rescore_history; with none the default stands in
+        qualities = [SPEAKING_LEVELS[r['speaking_quality']] for r in valid_responses
+                     if r.get('speaking_quality') in SPEAKING_LEVELS]
+        average = sum(qualities) / len(qualities) if qualities else DEFAULT_SPEAKING_VALUE
+        return final_score, self.speaking_level(average), valid_responses
+
+    def _band_codes(self, bands, values, codes):
+        # searchsorted over ascending thresholds picks each value's band
+        import numpy as np
+
+        thresholds = np.array([b[0] for b in reversed(bands)], dtype=np.float64)
+        band_codes = np.array([codes[b[1]] for b in reversed(bands)], dtype=np.int64)
+        index = np.searchsorted(thresholds, values, side="right") - 1
+        return band_codes[np.clip(index, 0, len(band_codes) - 1)]
+
+    def result_status_codes(self, final_scores, codes):
+        """Vectorized result_status, as codes from the label -> code mapping `codes`"""
+        return self._band_codes(self.definition["result_bands"], final_scores, codes)
+
+    def speaking_level_codes(self, averages, codes):
+        """Vectorized speaking_level, as codes from the label -> code mapping `codes`"""
+        return self._band_codes(self.definition["speaking_bands"], averages, codes)
+
+def final_score_of(average):
+    """Integer final score of a weighted average (rounded first so float noise never drops a point)"""
+    return int(round(average, 6))
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+def load_rubric(path):
+    """Rubric from a JSON file (re-read when the file changes), or the default rubric"""
+    # An invalid file keeps the last good rubric (the default before any) so scoring never breaks
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            if mtime is None:
+                cached = (None, Rubric(), None)
+            else:
+                try:
+                    with open(path) as f:
+                        cached = (mtime, Rubric(json.load(f)), None)
+                except (OSError, ValueError) as e:
+                    cached = (mtime, cached[1] if cached else Rubric(), f"{path}: {e}")
+            _loaded[path] = cached
+        return cached[1]
+
+def rubric_error(path):
+    """Why the rubric file was rejected by the last load_rubric(path), or None"""
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        return cached[2] if cached else None
+
+def setup_rubric_tables(cursor):
+    """Rubric version history, and the version each candidate was scored under"""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(candidates)").fetchall()]
+    if columns and "rubric_version" not in columns:
+        cursor.execute("ALTER TABLE candidates ADD COLUMN rubric_version INTEGER")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS rubrics (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        fingerprint TEXT UNIQUE NOT NULL,
+        definition TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    # Bumped on every re-score so open dashboards know stored scores changed
+    if "rescores" not in [row[1] for row in cursor.execute("PRAGMA table_info(rubrics)").fetchall()]:
+        cursor.execute("ALTER TABLE rubrics ADD COLUMN rescores INTEGER NOT NULL DEFAULT 0")
+
+def register_rubric(cursor, rubric):
+    """Version number of a rubric, recording it the first time it is used"""
+    row = cursor.execute("SELECT version FROM rubrics WHERE fingerprint = ?", (rubric.fingerprint,)).fetchone()
+    if row:
+        return row[0]
+    cursor.execute(
+        "INSERT INTO rubrics (fingerprint, definition) VALUES (?, ?)",
+        (rubric.fingerprint, json.dumps(rubric.definition, sort_keys=True))
+    )
+    return cursor.lastrowid
+
+def stale_candidates(conn, version):
+    """Number of candidates scored under a rubric version other than `version`"""
+    return conn.execute(
+        "SELECT COUNT(*) FROM candidates WHERE rubric_version IS NULL OR rubric_version != ?", (version,)
+    ).fetchone()[0]
+
+def _skill_totals(candidate_ids, skill_ids, values):
+    """Sum the value columns per (candidate, skill); returns candidate ids, skill ids and sums"""
+    import numpy as np
+
+    if not len(candidate_ids):
+        return candidate_ids, skill_ids, values
+    unique_skills, skill_index = np.unique(skill_ids.astype(str), return_inverse=True)
+    groups, position = np.unique(candidate_ids * len(unique_skills) + skill_index, return_inverse=True)
+    sums = np.column_stack([np.bincount(position, weights=column, minlength=len(groups)) for column in values.T])
+    return groups // len(unique_skills), unique_skills[groups % len(unique_skills)].astype(object), sums
+
+def _archived_totals(archived):
+    """Per-(candidate, skill) totals of archived answers, in the column order of the SQL totals"""
+    import numpy as np
+
+    score = np.asarray(archived["score"], dtype=np.float64)
+    valid = score > 0
+    candidate_ids = np.asarray(archived["candidate_id"], dtype=np.int64)[valid]
+    score = score[valid]
+    skill_ids = np.array([s or "" for s in archived["skill_id"]], dtype=object)[valid]
+    levels = np.array([q or "" for q in archived["speaking_quality"]], dtype=object)[valid]
+
+    # Map distinct levels once, then index
+    unique_levels, level_index = np.unique(levels.astype(str), return_inverse=True)
+    quality = np.array([SPEAKING_LEVELS.get(q, 0) for q in unique_levels], dtype=np.float64)[level_index]
+
+    values = np.column_stack([score, np.ones(len(score)), quality, (quality > 0).astype(np.float64)])
+    return _skill_totals(candidate_ids, skill_ids, values.reshape(-1, 4))
+
+def rescore_history(conn, rubric, version, archived=None):
+    """Recompute final_score, speaking_quality and result_status of every candidate under `rubric`"""
+    # archived: columns (candidate_id, skill_id, score, speaking_quality) of answers
+    # moved out of interview_responses, counted alongside the live rows
+    import numpy as np
+
+    started = time.perf_counter()
+    cursor = conn.cursor()
+
+    # Labels are handled as integer codes so every comparison below stays numeric
+    labels = sorted({status for _, status in rubric.definition["result_bands"]}
+                    | {level for _, level in rubric.definition["speaking_bands"]} | set(SPEAKING_LEVELS))
+    codes = {label: code for code, label in enumerate(labels)}
+
+    # Speaking levels and label codes as temp tables so SQLite joins them in its scans
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS speaking_levels (level TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS rubric_labels (label TEXT PRIMARY KEY, code INTEGER NOT NULL)")
+    for table in ("speaking_levels", "rubric_labels"):
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.executemany("INSERT INTO speaking_levels VALUES (?, ?)", list(SPEAKING_LEVELS.items()))
+    cursor.executemany("INSERT INTO rubric_labels VALUES (?, ?)", list(codes.items()))
+
+    # Current values, -1 for labels this rubric does not use
+    current = np.array(cursor.execute('''
+    SELECT c.id, c.final_score, COALESCE(s.code, -1), COALESCE(l.code, -1)
+    FROM candidates c
+    LEFT JOIN rubric_labels s ON s.label = c.speaking_quality
+    LEFT JOIN rubric_labels l ON l.label = c.result_status
+    ORDER BY c.id
+    ''').fetchall(), dtype=np.int64).reshape(-1, 4)
+    if not len(current):
+        return {"candidates": 0, "changed": 0, "seconds": time.perf_counter() - started}
+
+    # Score, answer, speaking level and known level totals of each candidate's valid answers per
+    # skill; answers saved before speaking levels were stored per answer have none
+    rows = cursor.execute('''
+    SELECT r.candidate_id, COALESCE(r.skill_id, ''), TOTAL(r.score), COUNT(*), TOTAL(q.value), COUNT(q.value)
+    FROM interview_responses r
+    LEFT JOIN speaking_levels q ON q.level = r.speaking_quality
+    WHERE r.candidate_id IS NOT NULL AND r.score > 0
+    GROUP BY r.candidate_id, COALESCE(r.skill_id, '')
+    ''').fetchall()
+    candidate_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    skill_ids = np.array([row[1] for row in rows], dtype=object)
+    values = np.array([row[2:] for row in rows], dtype=np.float64).reshape(-1, 4)
+
+    if archived is not None:
+        archived_ids, archived_skills, archived_values = _archived_totals(archived)
+        candidate_ids, skill_ids, values = _skill_totals(
+            np.concatenate([candidate_ids, archived_ids]), np.concatenate([skill_ids, archived_skills]),
+            np.vstack([values, archived_values])
+        )
+
+    # Each skill adds its weighted mean score; weights are mapped once per distinct skill
+    unique_skills, skill_index = np.unique(skill_ids.astype(str), return_inverse=True)
+    weights = np.array([rubric.weight(s or None) for s in unique_skills], dtype=np.float64)[skill_index]
+    score_sum, answer_count, quality_total, known_total = values.T
+    totals = np.column_stack([candidate_ids, weights * score_sum / np.maximum(answer_count, 1), weights,
+                              quality_total, answer_count, known_total])
+
+    # Add the totals onto the candidate rows (sorted by id)
+    ids = current[:, 0]
+    sums = np.zeros((len(ids), 5))
+    if len(totals):
+        total_ids = totals[:, 0].astype(np.int64)
+        position = np.searchsorted(ids, total_ids)
+        known = (position < len(ids)) & (ids[np.minimum(position, len(ids) - 1)] == total_ids)
+        np.add.at(sums, position[known], totals[known, 1:])
+    weighted, weight_sum, quality_sum, answers, known_levels = sums.T
+
+    final_scores = np.zeros(len(ids), dtype=np.int64)
+    scored = weight_sum > 0
+    final_scores[scored] = np.floor(np.round(weighted[scored] / weight_sum[scored], 6)).astype(np.int64)
+
+    has_levels = known_levels > 0
+    averages = np.divide(quality_sum, known_levels, out=np.zeros(len(ids)), where=has_levels)
+    speaking = np.where(has_levels, rubric.speaking_level_codes(averages, codes), codes["Beginner"])
+    # Without any per-answer level the stored speaking quality is the only record of it
+    keep_speaking = (answers > 0) & ~has_levels
+    speaking[keep_speaking] = current[keep_speaking, 2]
+    status = rubric.result_status_codes(final_scores, codes)
+
+    changed = np.flatnonzero((final_scores != current[:, 1]) | (speaking != current[:, 2]) | (status != current[:, 3]))
+    label_names = np.array(labels, dtype=object)
+    speaking_names = np.where(keep_speaking[changed], None, label_names[speaking[changed]])
+
+    cursor.executemany(
+        "UPDATE candidates SET final_score = ?, speaking_quality = COALESCE(?, speaking_quality), result_status = ? "
+        "WHERE id = ?",
+        zip(final_scores[changed].tolist(), speaking_names.tolist(),
+            label_names[status[changed]].tolist(), ids[changed].tolist())
+    )
+    cursor.execute("UPDATE candidates SET rubric_version = ? WHERE rubric_version IS NULL OR rubric_version != ?",
+                   (version, version))
+    cursor.execute("UPDATE rubrics SET rescores = rescores + 1 WHERE version = ?", (version,))
+    conn.commit()
+    cursor.close()
+
+    return {"candidates": len(ids), "changed": len(changed), "seconds": time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored candidates under a rubric")
+    parser.add_argument("--database", default=os.getenv("DATABASE_PATH", "hiring_skilled_candidates.db"))
+    parser.add_argument("--rubric", default=os.getenv("RUBRIC_PATH", "rubric.json"),
+                        help="Rubric JSON file (the default rubric when missing)")
+    parser.add_argument("--archive-dir", default=os.getenv("ARCHIVE_DIR", "archive"))
+    args = parser.parse_args()
+
+    rubric = load_rubric(args.rubric)
+    if rubric_error(args.rubric):
+        raise SystemExit(f"Invalid rubric {rubric_error(args.rubric)}")
+    conn = sqlite3.connect(args.database)
+    cursor = conn.cursor()
+    setup_rubric_tables(cursor)
+    archive.setup_archive_table(cursor)
+    version = register_rubric(cursor, rubric)
+    conn.commit()
+
+    try:
+        archived = archive.read_archived_columns(
+            conn, args.archive_dir, ["candidate_id", "skill_id", "score", "speaking_quality"]
+        )
+    except RuntimeError as e:
+        raise SystemExit(f"Not re-scoring: {e}")
+    result = rescore_history(conn, rubric, version, archived)
+    print(f"Rubric v{version}: {result['candidates']} candidates re-scored, "
+          f"{result['changed']} changed, in {result['seconds']:.1f}s")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
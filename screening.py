@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+import app
+import llm_scheduler
+import skills
+
+# Bulk candidate screening: score written submissions from a CSV/XLSX file
+# in chunks and bulk-write them with the same schema as the interview app.
+#
+# Input is one row per answer, rows of the same candidate kept together:
+#   name, email, phone, position, experience, skills, skill, question, answer
+
+CANDIDATE_COLUMNS = ["name", "email", "phone", "position", "experience", "skills"]
+ANSWER_COLUMNS = ["skill", "question", "answer"]
+REQUIRED_COLUMNS = CANDIDATE_COLUMNS + ANSWER_COLUMNS
+
+DEFAULT_CHUNK_SIZE = 2000
+AI_THREADS = 16
+AI_TIMEOUT_RETRIES = 2
+
+def read_chunks(path, chunk_size, skip_rows=0):
+    """Stream the input file as DataFrames of at most chunk_size rows"""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h).strip().lower() for h in next(rows)]
+        for _ in range(skip_rows):
+            next(rows, None)
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+        workbook.close()
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                             skiprows=range(1, skip_rows + 1))
+        for chunk in reader:
+            chunk.columns = [c.strip().lower() for c in chunk.columns]
+            yield chunk
+
+def group_candidates(frame):
+    """Split a chunk into per-candidate records (in file order)"""
+    missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    frame = frame.fillna("").astype(str)
+    # Chunk carry-over and the rows_done checkpoint both rely on each candidate's rows being one block
+    starts = frame["email"] != frame["email"].shift()
+    if starts.sum() != frame["email"].nunique():
+        split = frame["email"][starts].duplicated()
+        raise ValueError(f"Rows of candidate {frame['email'][starts][split].iloc[0]!r} are not kept together")
+
+    candidates = []
+    for email, rows in frame.groupby("email", sort=False):
+        first = rows.iloc[0]
+        candidate_data = {c: first[c].strip() for c in CANDIDATE_COLUMNS}
+        candidates.append({
+            "candidate_data": candidate_data,
+            "experience_level": candidate_data["experience"].split('(')[0].strip() or "INTERMEDIATE",
+            "answers": rows[ANSWER_COLUMNS].to_dict("records"),
+            "row_count": len(rows)
+        })
+    return candidates
+
+def score_candidate_fallback(candidate):
+    """Score one candidate's answers with the offline evaluator (process pool task)"""
+    responses = []
+    for answer in candidate["answers"]:
+        text = answer["answer"].strip()
+        if not text or text.upper() == "SKIPPED":
+            score, feedback, speaking_quality = 0, ["Skipped"], "Beginner"
+        else:
+            score, feedback, speaking_quality = app.evaluate_fallback(text, answer["skill"], candidate["experience_level"])
+        skill_id, skill = skills.canonical_skill(answer["skill"])
+        responses.append({
+            "skill": skill,
+            "skill_id": skill_id,
+            "question": answer["question"],
+            "answer": text or "SKIPPED",
+            "score": score,
+            "feedback": feedback,
+            "speaking_quality": speaking_quality,
+            "response_time": 0
+        })
+    return responses
+
+def score_answer_ai(answer, experience_level):
+    """Score one answer through the LLM at batch priority in the shared scheduler"""
+    text = answer["answer"].strip()
+    if not text or text.upper() == "SKIPPED":
+        score, feedback, speaking_quality = 0, ["Skipped"], "Beginner"
+    else:
+        # A timed-out answer is retried, then fails the chunk (resumable from the checkpoint)
+        # rather than being saved with an offline demo score
+        for attempt in range(AI_TIMEOUT_RETRIES + 1):
+            try:
+                score, feedback, speaking_quality = app.evaluate_answer_with_ai(
+                    answer["question"], answer["skill"], experience_level, text,
+                    priority=llm_scheduler.PRIORITY_BATCH, session_id="batch", raise_timeout=True
+                )
+                break
+            except app.LLMTimeoutError:
+                if attempt == AI_TIMEOUT_RETRIES:
+                    raise
+    skill_id, skill = skills.canonical_skill(answer["skill"])
+    return {
+        "skill": skill,
+        "skill_id": skill_id,
+        "question": answer["question"],
+        "answer": text or "SKIPPED",
+        "score": score,
+        "feedback": feedback,
+        "speaking_quality": speaking_quality,
+        "response_time": 0
+    }
+
+def load_checkpoint(checkpoint_path, input_path):
+    if not os.path.exists(checkpoint_path):
+        return {"input": os.path.abspath(input_path), "rows_done": 0, "candidates_saved": 0, "candidates_skipped": 0}
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('input')}")
+    return checkpoint
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def write_candidates(conn, scored):
+    """Bulk-insert scored candidates in one transaction; existing emails are skipped"""
+    cursor = conn.cursor()
+    emails = [candidate["candidate_data"]["email"] for candidate, _ in scored]
+
+    saved = 0
+    with app.get_storage_backend().write_lock():
+        # Checked under the lock so an interview saved meanwhile is skipped, not a failed chunk
+        existing = set()
+        for start in range(0, len(emails), 500):
+            batch = emails[start:start + 500]
+            cursor.execute(f"SELECT email FROM candidates WHERE email IN ({','.join('?' * len(batch))})", batch)
+            existing.update(row[0] for row in cursor.fetchall())
+
+        for candidate, responses in scored:
+            candidate_data = candidate["candidate_data"]
+            if candidate_data["email"] in existing:
+                continue
+            existing.add(candidate_data["email"])
+
+            final_score, speaking_quality, valid_responses = app.compute_final_assessment(responses)
+            result_status = app.determine_result(final_score)[0]
+            app.insert_interview_records(
+                cursor, candidate_data, final_score, speaking_quality, result_status, valid_responses, 0
+            )
+            saved += 1
+
+        conn.commit()
+    cursor.close()
+    return saved, len(scored) - saved
+
+def run_batch(input_path, mode="fallback", chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+              checkpoint_path=None, progress=None, mp_context=None):
+    """Screen every candidate in input_path, resuming from the checkpoint if present"""
+    checkpoint_path = checkpoint_path or input_path + ".checkpoint.json"
+    checkpoint = load_checkpoint(checkpoint_path, input_path)
+    workers = workers or os.cpu_count() or 2
+
+    conn = app.get_storage_backend().connect()
+    if mode == "ai":
+        # Threads only wait on the scheduler, which enforces the rate limit
+        executor = ThreadPoolExecutor(max_workers=AI_THREADS)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)
+
+    try:
+        carry = None
+        finished = set()
+        chunks = read_chunks(input_path, chunk_size, checkpoint["rows_done"])
+        for chunk in chunks:
+            frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+            candidates = group_candidates(frame)
+            repeated = [c["candidate_data"]["email"] for c in candidates if c["candidate_data"]["email"] in finished]
+            if repeated:
+                raise ValueError(f"Rows of candidate {repeated[0]!r} are not kept together")
+
+            # The last candidate may continue into the next chunk (its rows are the last block)
+            last_rows = candidates[-1]["row_count"]
+            carry = frame.iloc[len(frame) - last_rows:]
+            candidates = candidates[:-1]
+            finished.update(c["candidate_data"]["email"] for c in candidates)
+            if candidates:
+                _process(candidates, mode, executor, workers, conn, checkpoint, checkpoint_path, progress)
+
+        if carry is not None and len(carry):
+            _process(group_candidates(carry), mode, executor, workers, conn, checkpoint, checkpoint_path, progress)
+    finally:
+        executor.shutdown()
+        conn.close()
+
+    return checkpoint
+
+def _process(candidates, mode, executor, workers, conn, checkpoint, checkpoint_path, progress):
+    if mode == "ai":
+        futures = [[executor.submit(score_answer_ai, answer, c["experience_level"]) for answer in c["answers"]]
+                   for c in candidates]
+        try:
+            all_responses = [[f.result() for f in candidate_futures] for candidate_futures in futures]
+        except Exception:
+            for candidate_futures in futures:
+                for f in candidate_futures:
+                    f.cancel()
+            raise
+    else:
+        chunksize = max(1, len(candidates) // (workers * 4))
+        all_responses = list(executor.map(score_candidate_fallback, candidates, chunksize=chunksize))
+
+    saved, skipped = write_candidates(conn, list(zip(candidates, all_responses)))
+
+    checkpoint["rows_done"] += sum(c["row_count"] for c in candidates)
+    checkpoint["candidates_saved"] += saved
+    checkpoint["candidates_skipped"] += skipped
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    if progress:
+        progress(checkpoint)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-screen candidates from a CSV/XLSX file")
+    parser.add_argument("input", help="CSV or XLSX file with one row per answer")
+    parser.add_argument("--mode", choices=["fallback", "ai"], default="fallback",
+                        help="fallback: offline scoring on a process pool; ai: LLM scoring at batch priority")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <input>.checkpoint.json)")
+    parser.add_argument("--database", default=None, help=f"SQLite database (default: {app.DATABASE_PATH})")
+    args = parser.parse_args()
+
+    # Make sure the schema exists before bulk writing
+    if args.database:
+        app.DATABASE_PATH = args.database
+    app.setup_database()
+
+    started = time.time()
+    checkpoint = run_batch(
+        args.input, args.mode, args.chunk_size, args.workers,
+        args.checkpoint,
+        progress=lambda c: print(f"{c['rows_done']} rows, {c['candidates_saved']} saved, "
+                                 f"{c['candidates_skipped']} already present", flush=True)
+    )
+    print(f"Done in {time.time() - started:.1f}s: {checkpoint['candidates_saved']} candidates saved")
+
+if __name__ == "__main__":
+    main()
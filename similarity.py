@@ -0,0 +1,282 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+# Near-duplicate answer detection across the candidate pool. Each answer is
+# reduced to word 3-gram shingles, a 64-value MinHash signature and 16 LSH
+# band keys (4 signature values each). Answers sharing a band key are
+# candidates; a candidate pair is flagged when the exact Jaccard similarity
+# of the two shingle sets reaches SIMILARITY_THRESHOLD. With 16 bands of 4
+# rows a pair at Jaccard 0.7 collides in at least one band ~98% of the time.
+#
+# The offline rebuild writes the new index into a staging table in short
+# transactions and only takes the write lock to swap it in, so answers keep
+# being saved (and checked) while it runs.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+MIN_SHINGLES = 10
+SIMILARITY_THRESHOLD = 0.7
+MAX_CANDIDATES = 200
+MAX_BUCKET_SIZE = 200
+STAGING_PREFIX = "answer_lsh_staging_"
+STAGING_BATCH_ROWS = 100000
+
+_rng = np.random.RandomState(20240601)
+PERM_A = _rng.randint(1, 2 ** 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+PERM_B = _rng.randint(0, 2 ** 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+SHINGLE_MIX = _rng.randint(1, 2 ** 62, size=SHINGLE_WORDS, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+BAND_MIX = _rng.randint(1, 2 ** 62, size=ROWS + 1, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def shingles(text):
+    """Distinct 64-bit hashes of the word 3-grams of an answer"""
+    words = WORD_PATTERN.findall((text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+
+    # Multiply-xor mix of each window of consecutive word hashes
+    count = len(words) - SHINGLE_WORDS + 1
+    mixed = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_WORDS):
+        mixed ^= hashes[offset:offset + count] * SHINGLE_MIX[offset]
+    return np.unique(mixed)
+
+def signature(shingle_hashes):
+    """MinHash signature: per permutation the minimum of (a*x + b) >> 32 over the shingles"""
+    values = (shingle_hashes[:, None] * PERM_A[None, :] + PERM_B[None, :]) >> np.uint64(32)
+    return values.min(axis=0).astype(np.uint32)
+
+def band_keys(signatures):
+    """LSH bucket key (signed 64-bit, band index mixed in) of every band of each signature"""
+    signatures = np.atleast_2d(signatures).astype(np.uint64).reshape(-1, BANDS, ROWS)
+    keys = np.arange(BANDS, dtype=np.uint64)[None, :] * BAND_MIX[ROWS]
+    for row in range(ROWS):
+        keys = keys ^ (signatures[:, :, row] * BAND_MIX[row])
+    return keys.view(np.int64)
+
+def jaccard(a, b):
+    if len(a) == 0 or len(b) == 0:
+        return 0.0
+    shared = len(np.intersect1d(a, b, assume_unique=True))
+    return shared / (len(a) + len(b) - shared)
+
+def setup_similarity_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS answer_lsh (
+        bucket INTEGER NOT NULL,
+        response_id INTEGER NOT NULL,
+        PRIMARY KEY (bucket, response_id)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS answer_flags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        response_id INTEGER NOT NULL,
+        matched_response_id INTEGER NOT NULL,
+        similarity REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (response_id, matched_response_id)
+    )
+    ''')
+
+def _same_owner(a_session, a_candidate, b_session, b_candidate):
+    """Answers of the same interview or candidate are not collusion"""
+    return (a_session is not None and a_session == b_session) or \
+           (a_candidate is not None and a_candidate == b_candidate)
+
+def check_answer(cursor, response_id, answer, session_id=None, candidate_id=None):
+    """Index a newly saved answer and flag earlier answers it nearly duplicates; returns the flags"""
+    answer_shingles = shingles(answer)
+    if len(answer_shingles) < MIN_SHINGLES:
+        return []
+    keys = band_keys(signature(answer_shingles))[0].tolist()
+
+    # Bucket lookups go through the primary key, so cost does not grow with the pool
+    placeholders = ",".join("?" * len(keys))
+    candidate_ids = [row[0] for row in cursor.execute(f'''
+    SELECT response_id FROM answer_lsh WHERE bucket IN ({placeholders}) AND response_id != ?
+    GROUP BY response_id ORDER BY COUNT(*) DESC LIMIT ?
+    ''', keys + [response_id, MAX_CANDIDATES]).fetchall()]
+
+    flags = []
+    if candidate_ids:
+        rows = cursor.execute(f'''
+        SELECT id, session_id, candidate_id, answer FROM interview_responses
+        WHERE id IN ({",".join("?" * len(candidate_ids))})
+        ''', candidate_ids).fetchall()
+        for other_id, other_session, other_candidate, other_answer in rows:
+            if _same_owner(session_id, candidate_id, other_session, other_candidate):
+                continue
+            score = jaccard(answer_shingles, shingles(other_answer))
+            if score >= SIMILARITY_THRESHOLD:
+                flags.append((response_id, other_id, score))
+
+    cursor.executemany("INSERT OR IGNORE INTO answer_lsh (bucket, response_id) VALUES (?, ?)",
+                       [(key, response_id) for key in keys])
+    cursor.executemany('''
+    INSERT OR IGNORE INTO answer_flags (response_id, matched_response_id, similarity) VALUES (?, ?, ?)
+    ''', flags)
+    return flags
+
+def compute_signatures(texts):
+    """MinHash signatures of a batch of answers (process pool task); short answers get None"""
+    result = []
+    for text in texts:
+        answer_shingles = shingles(text)
+        result.append(signature(answer_shingles) if len(answer_shingles) >= MIN_SHINGLES else None)
+    return result
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+def _drop_stale_staging(conn):
+    """Drop staging tables left behind by rebuilds whose process is gone"""
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (STAGING_PREFIX + "%",)
+    ).fetchall():
+        pid = name[len(STAGING_PREFIX):]
+        if not pid.isdigit() or int(pid) == os.getpid() or not _pid_alive(int(pid)):
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+    conn.commit()
+
+def rebuild_index(conn, workers=None, chunk_size=20000, progress=None, write_lock=None, mp_context=None):
+    """Offline pass: rebuild the LSH index over every stored answer and flag near-duplicate pairs"""
+    # conn must not be shared with other writers: the staging batches commit on it
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 2
+    write_lock = write_lock or nullcontext
+
+    ids, sessions, candidates, signatures = [], [], [], []
+    last_id = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+        while True:
+            # Keyset pages: no read stays open between pages to hold off writers
+            rows = conn.execute(
+                "SELECT id, session_id, candidate_id, answer FROM interview_responses WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            texts = [row[3] for row in rows]
+            parts = [texts[i:i + 500] for i in range(0, len(texts), 500)]
+            for part_rows, part_signatures in zip(
+                [rows[i:i + 500] for i in range(0, len(rows), 500)], executor.map(compute_signatures, parts)
+            ):
+                for row, sig in zip(part_rows, part_signatures):
+                    if sig is None:
+                        continue
+                    ids.append(row[0])
+                    sessions.append(row[1])
+                    candidates.append(row[2])
+                    signatures.append(sig)
+            if progress:
+                progress(len(ids))
+
+    if not ids:
+        return {"answers": 0, "pairs": 0, "flagged": 0, "seconds": time.perf_counter() - started}
+
+    ids = np.array(ids, dtype=np.int64)
+    signatures = np.vstack(signatures)
+    keys = band_keys(signatures)
+
+    # Group equal bucket keys by sorting; every bucket with 2+ answers yields candidate pairs
+    flat_keys = keys.ravel()
+    flat_rows = np.repeat(np.arange(len(ids)), BANDS)
+    order = np.argsort(flat_keys, kind="stable")
+    flat_keys, flat_rows = flat_keys[order], flat_rows[order]
+    boundaries = np.flatnonzero(np.diff(flat_keys)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(flat_keys)]))
+
+    pairs = set()
+    for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+        if end - start > MAX_BUCKET_SIZE:
+            # Boilerplate shared by very many answers says nothing about collusion
+            continue
+        members = flat_rows[start:end]
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pairs.add((min(members[i], members[j]), max(members[i], members[j])))
+
+    # Cheap signature estimate first, exact Jaccard on the texts only for likely matches
+    flagged = []
+    for a, b in pairs:
+        if _same_owner(sessions[a], candidates[a], sessions[b], candidates[b]):
+            continue
+        if np.mean(signatures[a] == signatures[b]) < SIMILARITY_THRESHOLD - 0.15:
+            continue
+        texts = dict(conn.execute("SELECT id, answer FROM interview_responses WHERE id IN (?, ?)",
+                                  (int(ids[a]), int(ids[b]))).fetchall())
+        score = jaccard(shingles(texts.get(int(ids[a]))), shingles(texts.get(int(ids[b]))))
+        if score >= SIMILARITY_THRESHOLD:
+            # The later answer is the suspicious one
+            flagged.append((int(ids[b]), int(ids[a]), score))
+
+    # Build the new index beside the live one, in short transactions
+    staging = f"{STAGING_PREFIX}{os.getpid()}"
+    _drop_stale_staging(conn)
+    conn.execute(f"""
+    CREATE TABLE {staging} (
+        bucket INTEGER NOT NULL,
+        response_id INTEGER NOT NULL,
+        PRIMARY KEY (bucket, response_id)
+    ) WITHOUT ROWID
+    """)
+    conn.commit()
+    bucket_keys, response_ids = flat_keys.tolist(), ids[flat_rows].tolist()
+    for start in range(0, len(bucket_keys), STAGING_BATCH_ROWS):
+        conn.executemany(f"INSERT INTO {staging} (bucket, response_id) VALUES (?, ?)", zip(
+            bucket_keys[start:start + STAGING_BATCH_ROWS], response_ids[start:start + STAGING_BATCH_ROWS]
+        ))
+        conn.commit()
+
+    # Swap it in; answers saved since the snapshot were indexed live and are carried over
+    with write_lock():
+        conn.execute(f"INSERT OR IGNORE INTO {staging} SELECT bucket, response_id FROM answer_lsh WHERE response_id > ?",
+                     (last_id,))
+        conn.execute("DROP TABLE answer_lsh")
+        conn.execute(f"ALTER TABLE {staging} RENAME TO answer_lsh")
+        conn.executemany('''
+        INSERT OR IGNORE INTO answer_flags (response_id, matched_response_id, similarity) VALUES (?, ?, ?)
+        ''', flagged)
+        conn.commit()
+
+    return {"answers": len(ids), "pairs": len(pairs), "flagged": len(flagged),
+            "seconds": time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the answer similarity index and flag near-duplicates")
+    parser.add_argument("--database", default=os.getenv("DATABASE_PATH", "hiring_skilled_candidates.db"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    setup_similarity_tables(conn.cursor())
+    conn.commit()
+
+    result = rebuild_index(conn, args.workers, progress=lambda n: print(f"{n} answers signed", flush=True))
+    print(f"{result['answers']} answers indexed, {result['pairs']} candidate pairs, "
+          f"{result['flagged']} flagged in {result['seconds']:.1f}s")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import re
+
+# Skill taxonomy: canonical skill ids with their display names and the
+# spellings candidates use for them. The free-text skills field is matched
+# against an alias trie so "reactjs", "React.js" and "react js" all resolve
+# to the same id, which question caching, analytics and storage share.
+
+SKILL_TAXONOMY = {
+    # Languages
+    "python": ("Python", ["python", "python3", "py"]),
+    "java": ("Java", ["java", "core java", "java se", "java ee", "j2ee"]),
+    "javascript": ("JavaScript", ["javascript", "js", "ecmascript", "es6", "vanilla js"]),
+    "typescript": ("TypeScript", ["typescript", "ts"]),
+    "c": ("C", ["c", "c language", "ansi c"]),
+    "cpp": ("C++", ["c++", "cpp", "cplusplus"]),
+    "csharp": ("C#", ["c#", "csharp", "c sharp"]),
+    "go": ("Go", ["go", "golang"]),
+    "rust": ("Rust", ["rust", "rustlang"]),
+    "r": ("R", ["r", "r language", "r programming", "rstats"]),
+    "ruby": ("Ruby", ["ruby"]),
+    "php": ("PHP", ["php"]),
+    "kotlin": ("Kotlin", ["kotlin"]),
+    "swift": ("Swift", ["swift"]),
+    "scala": ("Scala", ["scala"]),
+    "sql": ("SQL", ["sql", "tsql", "t-sql", "pl/sql", "plsql"]),
+    "bash": ("Shell Scripting", ["bash", "shell", "shell scripting", "sh"]),
+    # Web and frameworks
+    "html": ("HTML", ["html", "html5"]),
+    "css": ("CSS", ["css", "css3", "sass", "scss"]),
+    "react": ("React", ["react", "reactjs", "react.js", "react js"]),
+    "react_native": ("React Native", ["react native"]),
+    "angular": ("Angular", ["angular", "angularjs", "angular.js"]),
+    "vue": ("Vue", ["vue", "vuejs", "vue.js"]),
+    "nextjs": ("Next.js", ["next.js", "nextjs"]),
+    "nodejs": ("Node.js", ["node", "nodejs", "node.js", "node js"]),
+    "express": ("Express", ["express", "expressjs", "express.js"]),
+    "django": ("Django", ["django"]),
+    "flask": ("Flask", ["flask"]),
+    "fastapi": ("FastAPI", ["fastapi", "fast api"]),
+    "spring": ("Spring Boot", ["spring", "spring boot", "springboot"]),
+    "dotnet": (".NET", [".net", "dotnet", "asp.net", "net core", ".net core"]),
+    "rails": ("Ruby on Rails", ["rails", "ruby on rails", "ror"]),
+    "graphql": ("GraphQL", ["graphql"]),
+    "rest_api": ("REST APIs", ["rest", "rest api", "rest apis", "restful", "restful api"]),
+    "flutter": ("Flutter", ["flutter"]),
+    "android": ("Android", ["android", "android development"]),
+    "ios": ("iOS", ["ios", "ios development"]),
+    # Data and ML
+    "machine_learning": ("Machine Learning", ["machine learning", "ml"]),
+    "deep_learning": ("Deep Learning", ["deep learning", "dl"]),
+    "nlp": ("NLP", ["nlp", "natural language processing"]),
+    "computer_vision": ("Computer Vision", ["computer vision", "cv", "opencv"]),
+    "data_science": ("Data Science", ["data science"]),
+    "data_analysis": ("Data Analysis", ["data analysis", "data analytics"]),
+    "data_engineering": ("Data Engineering", ["data engineering", "etl"]),
+    "pandas": ("Pandas", ["pandas"]),
+    "numpy": ("NumPy", ["numpy"]),
+    "tensorflow": ("TensorFlow", ["tensorflow", "tf", "keras"]),
+    "pytorch": ("PyTorch", ["pytorch", "torch"]),
+    "scikit_learn": ("scikit-learn", ["scikit-learn", "scikit learn", "sklearn"]),
+    "spark": ("Apache Spark", ["spark", "apache spark", "pyspark"]),
+    "kafka": ("Apache Kafka", ["kafka", "apache kafka"]),
+    "airflow": ("Apache Airflow", ["airflow", "apache airflow"]),
+    "power_bi": ("Power BI", ["power bi", "powerbi"]),
+    "tableau": ("Tableau", ["tableau"]),
+    "excel": ("Excel", ["excel", "ms excel", "microsoft excel"]),
+    "llm": ("LLMs", ["llm", "llms", "large language models", "generative ai", "genai"]),
+    # Databases
+    "postgresql": ("PostgreSQL", ["postgresql", "postgres", "psql"]),
+    "mysql": ("MySQL", ["mysql"]),
+    "sqlite": ("SQLite", ["sqlite"]),
+    "oracle": ("Oracle Database", ["oracle", "oracle db", "oracle database"]),
+    "sql_server": ("SQL Server", ["sql server", "mssql", "ms sql"]),
+    "mongodb": ("MongoDB", ["mongodb", "mongo"]),
+    "redis": ("Redis", ["redis"]),
+    "elasticsearch": ("Elasticsearch", ["elasticsearch", "elastic search", "elk"]),
+    # Cloud and DevOps
+    "aws": ("AWS", ["aws", "amazon web services"]),
+    "azure": ("Azure", ["azure", "microsoft azure"]),
+    "gcp": ("Google Cloud", ["gcp", "google cloud", "google cloud platform"]),
+    "docker": ("Docker", ["docker", "containers"]),
+    "kubernetes": ("Kubernetes", ["kubernetes", "k8s", "kube"]),
+    "terraform": ("Terraform", ["terraform"]),
+    "ansible": ("Ansible", ["ansible"]),
+    "jenkins": ("Jenkins", ["jenkins"]),
+    "ci_cd": ("CI/CD", ["ci/cd", "cicd", "ci cd", "continuous integration"]),
+    "devops": ("DevOps", ["devops", "dev ops"]),
+    "git": ("Git", ["git", "github", "gitlab"]),
+    "linux": ("Linux", ["linux", "unix"]),
+    "microservices": ("Microservices", ["microservices", "micro services"]),
+    "system_design": ("System Design", ["system design"]),
+    # Other disciplines
+    "cybersecurity": ("Cybersecurity", ["cybersecurity", "cyber security", "information security", "infosec"]),
+    "blockchain": ("Blockchain", ["blockchain", "web3"]),
+    "solidity": ("Solidity", ["solidity"]),
+    "testing": ("Software Testing", ["testing", "software testing", "qa", "quality assurance"]),
+    "selenium": ("Selenium", ["selenium"]),
+    "ui_ux": ("UI/UX Design", ["ui/ux", "ui ux", "ux", "ui design", "ux design", "figma"])
+}
+
+# Aliases this short are only recognised when they make up a whole entry,
+# so a lone "R" or "Go" counts but the word "go" inside a sentence does not.
+# Short aliases ending in "#" or "+" ("c#") are never ordinary words and are
+# matched anywhere, so "c++ and c#" keeps both
+EXACT_ONLY_LENGTH = 2
+SYMBOL_SUFFIXES = "+#"
+
+# Id of a single skill label with no letters or digits at all
+UNKNOWN_SKILL_ID = "other"
+
+# Entries are separated by commas, semicolons, pipes and newlines; within
+# an entry spaces, dots, hyphens and underscores are ignored for matching
+ENTRY_SEPARATORS = re.compile(r"[,;|\n\r]+")
+SOFT_SEPARATORS = " .-_\t"
+WORD_CHARS = re.compile(r"[a-z0-9+#]")
+
+def _key(text):
+    """Matching key: lowercase with soft separators removed"""
+    return "".join(ch for ch in text.lower() if ch not in SOFT_SEPARATORS)
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9+#]+", "_", text.lower()).strip("_")
+
+class SkillIndex:
+    """Alias trie over the taxonomy; lookups walk the input once"""
+
+    def __init__(self, taxonomy):
+        self.names = {skill_id: name for skill_id, (name, _) in taxonomy.items()}
+        self.root = {}
+        self.exact = {}
+        for skill_id, (name, aliases) in taxonomy.items():
+            for alias in set(aliases + [name]):
+                key = _key(alias)
+                if len(key) <= EXACT_ONLY_LENGTH:
+                    self.exact[key] = skill_id
+                    if not key.endswith(tuple(SYMBOL_SUFFIXES)):
+                        continue
+                node = self.root
+                for ch in key:
+                    node = node.setdefault(ch, {})
+                node[None] = skill_id
+
+    def name(self, skill_id):
+        """Display name for a canonical id (custom skills keep their own)"""
+        return self.names.get(skill_id, skill_id.replace("_", " ").title())
+
+    def _scan(self, entry):
+        """Longest alias matches starting at word boundaries within one entry"""
+        text = entry.lower()
+        matches = []
+        i = 0
+        while i < len(text):
+            # Only start a match at the beginning of a word
+            if not WORD_CHARS.match(text[i]) or (i > 0 and WORD_CHARS.match(text[i - 1])):
+                i += 1
+                continue
+
+            node, j, best = self.root, i, None
+            while j < len(text):
+                ch = text[j]
+                if ch in SOFT_SEPARATORS:
+                    j += 1
+                    continue
+                node = node.get(ch)
+                if node is None:
+                    break
+                j += 1
+                # A match must end on a word boundary
+                if None in node and (j == len(text) or not WORD_CHARS.match(text[j])):
+                    best = (node[None], j)
+
+            if best:
+                matches.append(best[0])
+                i = best[1]
+            else:
+                i += 1
+        return matches
+
+    def resolve(self, entry):
+        """Canonical ids mentioned in one free-text entry; unknown entries get a slug id, punctuation none"""
+        key = _key(entry)
+        if not key:
+            return []
+        if key in self.exact:
+            return [self.exact[key]]
+        matches = self._scan(entry)
+        if matches:
+            return matches
+        slug = _slug(entry)
+        return [slug] if slug else []
+
+    def parse(self, text, limit=None):
+        """Ordered, de-duplicated (skill_id, display name) pairs from a skills field"""
+        seen = {}
+        for entry in ENTRY_SEPARATORS.split(text or ""):
+            entry = entry.strip()
+            if not entry:
+                continue
+            for skill_id in self.resolve(entry):
+                display = self.names.get(skill_id, entry.strip().title())
+                seen.setdefault(skill_id, display)
+                if limit and len(seen) >= limit:
+                    return list(seen.items())
+        return list(seen.items())
+
+SKILL_INDEX = SkillIndex(SKILL_TAXONOMY)
+
+def parse_skills(text, limit=None):
+    """Skills field -> [(skill_id, display name)] in the order the candidate listed them"""
+    return SKILL_INDEX.parse(text, limit)
+
+def canonical_skill(text):
+    """(skill_id, display name) for a single skill label such as a question's skill column"""
+    parsed = SKILL_INDEX.parse(text, limit=1)
+    if parsed:
+        return parsed[0]
+    return _slug(text) or UNKNOWN_SKILL_ID, (text or "").strip().title() or "Other"
+
+def skill_name(skill_id):
+    """Display name of a canonical skill id"""
+    return SKILL_INDEX.name(skill_id)
@@ -0,0 +1,201 @@
+import importlib.util
+import os
+import re
+import shutil
+import subprocess
+
+import numpy as np
+
+# Speech processing for recorded answers. Kept free of Streamlit so the
+# functions can run inside worker processes.
+
+_whisper_model = None
+_whisper_pipeline = None
+_batch_size = 8
+
+def transcription_available():
+    """True when a local speech-to-text engine is installed"""
+    return importlib.util.find_spec("faster_whisper") is not None
+
+def init_transcription_worker(model_name, cpu_threads, batch_size):
+    """Load the CPU int8 Whisper model once per worker process"""
+    global _whisper_model, _whisper_pipeline, _batch_size
+    from faster_whisper import WhisperModel
+
+    _whisper_model = WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+    _batch_size = batch_size
+    try:
+        from faster_whisper import BatchedInferencePipeline
+        _whisper_pipeline = BatchedInferencePipeline(model=_whisper_model)
+    except ImportError:
+        _whisper_pipeline = None
+
+def transcribe_file(path):
+    """Transcribe one recording, returning its text and audio duration"""
+    if _whisper_pipeline is not None:
+        segments, info = _whisper_pipeline.transcribe(path, batch_size=_batch_size, vad_filter=True)
+    else:
+        segments, info = _whisper_model.transcribe(path, beam_size=1, vad_filter=True)
+
+    words = []
+    for segment in segments:
+        words.append(segment.text.strip())
+    return {"text": " ".join(w for w in words if w), "duration": float(info.duration), "error": None}
+
+def transcribe_batch(paths):
+    """Transcribe several recordings in one worker call"""
+    results = []
+    for path in paths:
+        if not os.path.exists(path):
+            results.append({"text": "", "duration": 0.0, "error": "Recording not found"})
+            continue
+        try:
+            results.append(transcribe_file(path))
+        except Exception as e:
+            results.append({"text": "", "duration": 0.0, "error": str(e)})
+    return results
+
+# Speaking-quality analysis
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+PITCH_FRAME_SECONDS = 0.040
+PITCH_HOP_SECONDS = 0.020
+MIN_PAUSE_SECONDS = 0.3
+PITCH_RANGE_HZ = (75, 400)
+
+# "like" only counts when set off by a comma ("it was, like, slow"); as a verb or
+# comparison it is ordinary speech, and "actually" too seldom marks a filler to count
+FILLER_PATTERN = re.compile(r"\b(?:um+|uh+m?|erm|er|ah+|hmm+|you know|i mean|basically|literally)\b|\blike(?=,)")
+
+def decode_audio(path, sample_rate=SAMPLE_RATE):
+    """Decode any recording to mono float32 PCM"""
+    try:
+        from faster_whisper import decode_audio as whisper_decode
+        return whisper_decode(path, sampling_rate=sample_rate)
+    except ImportError:
+        pass
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("Audio decoding needs faster-whisper or ffmpeg")
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", path,
+         "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        capture_output=True, check=True
+    )
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+def _frames(samples, frame_length, hop_length):
+    if len(samples) < frame_length:
+        samples = np.pad(samples, (0, frame_length - len(samples)))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::hop_length]
+
+def _speech_mask(samples, sample_rate):
+    """Per-frame voice activity from frame energy relative to the noise floor"""
+    frames = _frames(samples, int(FRAME_SECONDS * sample_rate), int(HOP_SECONDS * sample_rate))
+    energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = max(noise_floor + 10, energy_db.max() - 45)
+    return energy_db > threshold
+
+def _pause_ratio(speech_mask):
+    """Share of the speaking span spent in pauses of at least MIN_PAUSE_SECONDS"""
+    voiced = np.flatnonzero(speech_mask)
+    if len(voiced) < 2:
+        return 1.0, 0.0
+    span = speech_mask[voiced[0]:voiced[-1] + 1]
+    
+    # Run lengths of silence inside the span
+    edges = np.diff(np.concatenate(([0], (~span).astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    min_frames = int(MIN_PAUSE_SECONDS / HOP_SECONDS)
+    paused = lengths[lengths >= min_frames].sum()
+    return paused / len(span), len(span) * HOP_SECONDS
+
+def _pitch_track(samples, sample_rate):
+    """Fundamental frequency (Hz) of voiced frames via FFT autocorrelation"""
+    frame_length = int(PITCH_FRAME_SECONDS * sample_rate)
+    frames = _frames(samples, frame_length, int(PITCH_HOP_SECONDS * sample_rate)).astype(np.float32)
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    
+    energy = np.sum(frames ** 2, axis=1)
+    loud = energy > np.percentile(energy, 50)
+    frames = frames[loud] * np.hanning(frame_length).astype(np.float32)
+    if len(frames) == 0:
+        return np.empty(0)
+    
+    n_fft = 1 << (2 * frame_length - 1).bit_length()
+    spectrum = np.fft.rfft(frames, n=n_fft, axis=1)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), n=n_fft, axis=1)[:, :frame_length]
+    
+    min_lag = int(sample_rate / PITCH_RANGE_HZ[1])
+    max_lag = int(sample_rate / PITCH_RANGE_HZ[0])
+    window = autocorr[:, min_lag:max_lag]
+    best = np.argmax(window, axis=1)
+    strength = window[np.arange(len(window)), best] / (autocorr[:, 0] + 1e-10)
+    
+    voiced = strength > 0.3
+    return sample_rate / (best[voiced] + min_lag)
+
+def speaking_level(wpm, pause_ratio, filler_rate, pitch_std_semitones):
+    """Map speech measurements to the five-level speaking quality scale"""
+    points, available = 0, 0
+    
+    if wpm is not None:
+        available += 2
+        if 120 <= wpm <= 170: points += 2
+        elif 100 <= wpm <= 190: points += 1
+    
+    available += 2
+    if pause_ratio < 0.2: points += 2
+    elif pause_ratio < 0.35: points += 1
+    
+    if filler_rate is not None:
+        available += 2
+        if filler_rate < 2: points += 2
+        elif filler_rate < 5: points += 1
+    
+    if pitch_std_semitones is not None:
+        available += 2
+        if 2 <= pitch_std_semitones <= 6: points += 2
+        elif 1 <= pitch_std_semitones <= 8: points += 1
+    
+    ratio = points / available
+    if ratio >= 0.85: return "Proficiency"
+    if ratio >= 0.65: return "Fluent"
+    if ratio >= 0.5: return "Advanced"
+    if ratio >= 0.25: return "Intermediate"
+    return "Beginner"
+
+def analyze_speech(samples, sample_rate=SAMPLE_RATE, transcript=""):
+    """Words per minute, pause ratio, filler rate and pitch spread (semitone std) of a clip"""
+    samples = np.asarray(samples, dtype=np.float32)
+    pause_ratio, speaking_seconds = _pause_ratio(_speech_mask(samples, sample_rate))
+    
+    words = transcript.lower().split() if transcript else []
+    if words and speaking_seconds > 0:
+        wpm = len(words) / (speaking_seconds / 60)
+        filler_rate = 100 * len(FILLER_PATTERN.findall(" ".join(words))) / len(words)
+    else:
+        wpm, filler_rate = None, None
+    
+    # Pitch spread in semitones around the speaker's median
+    f0 = _pitch_track(samples, sample_rate)
+    if len(f0) >= 10:
+        pitch_std_semitones = float(np.std(12 * np.log2(f0 / np.median(f0))))
+    else:
+        pitch_std_semitones = None
+    
+    return {
+        "wpm": wpm,
+        "pause_ratio": float(pause_ratio),
+        "filler_rate": filler_rate,
+        "pitch_std_semitones": pitch_std_semitones,
+        "speaking_quality": speaking_level(wpm, pause_ratio, filler_rate, pitch_std_semitones)
+    }
+
+def analyze_recording(path, transcript=""):
+    """Decode a recording and analyze its speech"""
+    return analyze_speech(decode_audio(path), SAMPLE_RATE, transcript)
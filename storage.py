@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Storage backends for candidate data and in-flight interview state.
+# Every backend hands out DB-API connections for the candidates /
+# interview_responses tables and checkpoints the session state of
+# running interviews so another worker (or a restarted one) can resume.
+#
+# Writes go through write_transaction(): the write lock plus a connection
+# owned by the calling thread, so one session's commit or rollback never
+# takes another session's half-done statements with it.
+#
+# Recorded answers are not part of the shared state: uploads land in the
+# memory of the one worker that holds the media upload port, so with
+# shared-sqlite interviews that record audio must be routed to that worker.
+
+class StorageBackend:
+    """Interface for candidate storage and interview session checkpoints"""
+
+    name = "base"
+
+    def connect(self):
+        """New DB-API connection to the candidate database"""
+        raise NotImplementedError
+
+    @contextmanager
+    def write_lock(self):
+        """Serialize writers that must not interleave"""
+        yield
+
+    def thread_connection(self):
+        """Connection owned by the calling thread, so its transaction is never shared"""
+        raise NotImplementedError
+
+    @contextmanager
+    def write_transaction(self):
+        """The calling thread's connection under write_lock; commits on success, rolls back on error"""
+        with self.write_lock():
+            conn = self.thread_connection()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def save_session_state(self, session_id, state):
+        raise NotImplementedError
+
+    def load_session_state(self, session_id):
+        raise NotImplementedError
+
+    def delete_session_state(self, session_id):
+        raise NotImplementedError
+
+class SQLiteBackend(StorageBackend):
+    """Default backend: one SQLite file used by a single process"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._lock = threading.Lock()
+        conn = self.connect()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS session_checkpoints (
+            session_id TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def thread_connection(self):
+        # Closed with its thread
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self.connect()
+        return conn
+
+    @contextmanager
+    def write_lock(self):
+        with self._lock:
+            yield
+
+    def save_session_state(self, session_id, state):
+        payload = json.dumps(state)
+        with self.write_lock():
+            conn = self.thread_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO session_checkpoints (session_id, state, updated_at) VALUES (?, ?, ?)",
+                (session_id, payload, time.time())
+            )
+            conn.commit()
+
+    def load_session_state(self, session_id):
+        row = self.thread_connection().execute(
+            "SELECT state FROM session_checkpoints WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_session_state(self, session_id):
+        with self.write_lock():
+            conn = self.thread_connection()
+            conn.execute("DELETE FROM session_checkpoints WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+class SharedSQLiteBackend(SQLiteBackend):
+    """SQLite in WAL mode shared by several worker processes, writes serialized by a file lock"""
+
+    name = "shared-sqlite"
+    BUSY_TIMEOUT_MS = 10000
+
+    def __init__(self, path):
+        self.lock_path = path + ".lock"
+        super().__init__(path)
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.BUSY_TIMEOUT_MS / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+        return conn
+
+    @contextmanager
+    def write_lock(self):
+        # Thread lock for this process, file lock across processes
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+BACKENDS = {
+    SQLiteBackend.name: SQLiteBackend,
+    SharedSQLiteBackend.name: SharedSQLiteBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(kind, path):
+    """Process-wide backend instance for (kind, path)"""
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{kind}', expected one of: {', '.join(BACKENDS)}")
+    key = (kind, os.path.abspath(path))
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = BACKENDS[kind](path)
+        return _backends[key]